@@ -7,6 +7,9 @@
 #############################################################
 
 import pygame as pg
+import assets
+
+TEXT_CACHE_SIZE = 256  # Most rendered text surfaces to keep around
 
 class HUD:
     def __init__(self, screen, font_size=24, font_color='white'):
@@ -18,75 +21,103 @@ class HUD:
         :param font_color: The color of the font used for text.
         """
         self.screen = screen
-        self.font = pg.font.Font(None, font_size)
+        self.font = assets.shared.font(font_size)  # Shared with everything else using this size
         self.font_color = pg.Color(font_color)
         self.total_sugar = 0
         self.sugar_in_buckets = {}
         self.num_sugar_drop = 0
         self.level_count = 1
         self.gravity_pos = "DOWN"
+        # Rendered text surfaces keyed by their text, so unchanged values aren't rendered again
+        self.text_cache = {}
+        # The whole HUD composited into one surface, rebuilt only when a value changes
+        self.surface = None
+        self.rect = None  # Part of the screen the HUD text covers
+        self.dirty = True
+        #the instructions never change so render them once
+        self.pause_surface = self.render_text('Press space to pause')
+        self.gravity1_surface = self.render_text('Press G to change gravity')
+
+    def render_text(self, text):
+        """
+        Render a line of text, reusing the surface if this text was rendered before.
+
+        :param text: The text to render.
+        """
+        surface = self.text_cache.get(text)
+        if surface is None:
+            if len(self.text_cache) >= TEXT_CACHE_SIZE:
+                self.text_cache.clear()  # Old counts are not coming back, start over
+            surface = self.font.render(text, True, self.font_color)
+            self.text_cache[text] = surface
+        return surface
 
     def update(self, total_sugar, sugar_in_buckets, sugar_left, level_count,gravity_pos):
         """
-        Update the Head up display values.
+        Update the Head up display values. The HUD is only marked dirty when one of them changed.
 
         :param total_sugar: total number sugar grains in the game.
-        :param sugar_in_buckets: dictionary with bucket IDs as keys and sugar counts as values.
+        :param sugar_in_buckets: list of the bucket objects of the level.
         :param sugar_not_sent: count of  the sugar not yet sent from the spout.
         :param level_count: Current level number.
         """
+        # Process the list of bucket objects to extract their counts
+        bucket_counts = tuple(bucket.count for bucket in sugar_in_buckets)
+        if (total_sugar, sugar_left, level_count, gravity_pos) == (self.total_sugar, self.num_sugar_drop, self.level_count, self.gravity_pos) \
+                and bucket_counts == tuple(self.sugar_in_buckets.values()):
+            return
         self.total_sugar = total_sugar
-        self.sugar_in_buckets = sugar_in_buckets
         self.num_sugar_drop = sugar_left
         self.level_count = level_count
         self.gravity_pos = gravity_pos
-         # Process the list of bucket objects to extract their IDs and counts
-        self.sugar_in_buckets = {idx: bucket.count for idx, bucket in enumerate(sugar_in_buckets)}
+        self.sugar_in_buckets = dict(enumerate(bucket_counts))
+        self.dirty = True
 
-
-    def draw(self):
+    def compose(self):
         """
-        Draw the HUD on the screen.
+        Render the HUD text into the cached HUD surface.
         """
         y_offset = 10  # Vertical spacing
         x_offset = 10  # Horizontal margin
+        lines = []
 
         # Drawing the total Count of sugar on the screen
-        total_sugar_surface = self.font.render(f"Total Sugar: {self.total_sugar}", True, self.font_color)
-        self.screen.blit(total_sugar_surface, (x_offset, y_offset))
-        y_offset += total_sugar_surface.get_height() + 5
+        lines.append(self.render_text(f"Total Sugar: {self.total_sugar}"))
 
         # Drawing the sugar in buckets
         for bucket_id, count in self.sugar_in_buckets.items():
-            bucket_sugar_surface = self.font.render(f"Bucket {bucket_id+1}: {count} grains", True, self.font_color)
-            self.screen.blit(bucket_sugar_surface, (x_offset, y_offset))
-            y_offset += bucket_sugar_surface.get_height() + 5
+            lines.append(self.render_text(f"Bucket {bucket_id+1}: {count} grains"))
 
         # Drawing sugar remain
         sugar_left = self.total_sugar - int(self.num_sugar_drop)
-        Sugar_left_surface = self.font.render(f"Sugar Left: {sugar_left}", True, self.font_color)
-        self.screen.blit(Sugar_left_surface, (x_offset, y_offset))
-        y_offset += Sugar_left_surface.get_height() + 5
+        lines.append(self.render_text(f"Sugar Left: {sugar_left}"))
 
         # Drawing level count
-        level_surface = self.font.render(f"Current Level: {self.level_count}", True, self.font_color)
-        self.screen.blit(level_surface, (x_offset, y_offset))
-        y_offset += level_surface.get_height() + 5
+        lines.append(self.render_text(f"Current Level: {self.level_count}"))
 
+        height = y_offset + sum(line.get_height() + 5 for line in lines)
+        if self.surface is None or self.surface.get_height() < height:
+            self.surface = pg.Surface((self.screen.get_width(), height), pg.SRCALPHA)
+        self.surface.fill((0, 0, 0, 0))
+
+        for line in lines:
+            self.surface.blit(line, (x_offset, y_offset))
+            y_offset += line.get_height() + 5
 
         # drawing the gravity text
-        gravity_text = f"Gravity is : {self.gravity_pos}"
-        gravity_surface = self.font.render(gravity_text, True, self.font_color)
-        self.screen.blit(gravity_surface, (400, 10))
+        self.surface.blit(self.render_text(f"Gravity is : {self.gravity_pos}"), (400, 10))
 
         #drawing the instructions
-        pause_text =  'Press space to pause'
-        pause_surface = self.font.render(pause_text, True, self.font_color)
-        self.screen.blit(pause_surface,(800,10))
+        self.surface.blit(self.pause_surface, (800, 10))
         #drawing the gavity text message
-        gravity1_text = 'Press G to change gravity'
-        gravity1_text = self.font.render(gravity1_text, True, self.font_color)
-        self.screen.blit(gravity1_text,(800,25))
-
+        self.surface.blit(self.gravity1_surface, (800, 25))
+        self.rect = self.surface.get_bounding_rect()
+        self.dirty = False
 
-        
+    def draw(self):
+        """
+        Draw the HUD on the screen.
+        """
+        if self.dirty:
+            self.compose()
+        self.screen.blit(self.surface, (0, 0))
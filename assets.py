@@ -0,0 +1,167 @@
+#############################################################
+# Module Name: Sugar Pop Assets Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Images, sounds and fonts loaded once, on a background thread, and shared
+#############################################################
+import threading
+import pygame as pg
+
+# Every image and sound of the game
+IMAGE_FILES = {
+    "intro": './images/SugarPop.png',
+}
+SOUND_FILES = {
+    "complete_level": './sound/finish_level.wav',
+    "explosion": './sound/bucket_explode.wav',
+    "start_game": './sound/start_game.wav',
+    "hit_bucket": './sound/hit_bucket.wav'
+}
+
+
+class AssetManager:
+    """
+    Loads the game's images and sounds once and hands the same objects to
+    everyone who asks for them. Decoding the files is the slow part, so
+    start() does it on a background thread while the game shows its first
+    frames. Images are converted for the display on the main thread the
+    first time they are asked for, and every scaled copy is kept, keyed by
+    the resolution it was scaled to.
+    """
+    def __init__(self, images=IMAGE_FILES, sounds=SOUND_FILES):
+        """
+        Initialize the manager. Nothing is loaded until start() or the first request.
+
+        :param images: Dictionary of image key -> file path.
+        :param sounds: Dictionary of sound key -> file path.
+        """
+        self.image_files = images
+        self.sound_files = sounds
+        self.lock = threading.Lock()
+        self.loaded = threading.Event()  # Set once every file was decoded (or failed to)
+        self.thread = None
+        self.decoded = {}  # Image key -> surface as it came out of the file
+        self.sound_dict = {}  # Sound key -> pg.mixer.Sound
+        self.surfaces = {}  # (image key, resolution) -> surface ready to blit
+        self.fonts = {}  # (font name, size) -> pg.font.Font
+        self.load_ms = None  # How long decoding took
+
+    def start(self, background=True):
+        """
+        Start loading every asset. Does nothing if loading already started.
+
+        :param background: Decode on a background thread, or right here before returning.
+        """
+        with self.lock:
+            if self.thread is not None or self.loaded.is_set():
+                return
+            self.thread = threading.Thread(target=self._load, daemon=True)
+        if background:
+            self.thread.start()
+        else:
+            self._load()
+
+    def _load(self):
+        """
+        Decode every image, then every sound. Sounds need the mixer, so they
+        are skipped when it isn't running.
+        """
+        start = pg.time.get_ticks()
+        try:
+            for key, path in self.image_files.items():
+                try:
+                    surface = pg.image.load(path)
+                except (pg.error, OSError) as e:
+                    print(f"Could not load image {path}: {e}")
+                    continue
+                with self.lock:
+                    self.decoded[key] = surface
+            if pg.mixer.get_init():
+                for key, path in self.sound_files.items():
+                    try:
+                        sound = pg.mixer.Sound(path)
+                    except (pg.error, OSError) as e:
+                        print(f"Could not load sound {path}: {e}")
+                        continue
+                    with self.lock:
+                        self.sound_dict[key] = sound
+        finally:
+            self.load_ms = pg.time.get_ticks() - start
+            self.loaded.set()
+
+    @property
+    def done(self):
+        return self.loaded.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Wait for loading to finish, starting it here if nobody did.
+
+        :param timeout: Most seconds to wait, or None to wait as long as it takes.
+        :return: True if everything is loaded.
+        """
+        if self.thread is None:
+            self.start(background=False)
+        return self.loaded.wait(timeout)
+
+    def image(self, key, resolution=None, wait=True):
+        """
+        An image converted for the display and scaled to fit a resolution,
+        keeping its aspect ratio. The same surface is returned on every call.
+
+        :param key: Image key, see IMAGE_FILES.
+        :param resolution: (width, height) to fit the image into, or None for its own size.
+        :param wait: Wait for the image to be decoded, otherwise return None if it isn't yet.
+        :return: The surface, or None if it isn't loaded (or could not be).
+        """
+        surface = self.surfaces.get((key, resolution))
+        if surface is not None:
+            return surface
+        with self.lock:
+            decoded = self.decoded.get(key)
+        if decoded is None and wait and not self.done:
+            self.wait()
+            with self.lock:
+                decoded = self.decoded.get(key)
+        if decoded is None:
+            return None
+
+        # Converting needs the display, which belongs to the main thread
+        surface = decoded.convert() if pg.display.get_surface() else decoded
+        if resolution:
+            scale = min(resolution[0] / surface.get_width(), resolution[1] / surface.get_height())
+            surface = pg.transform.scale(surface, (int(surface.get_width() * scale), int(surface.get_height() * scale)))
+        self.surfaces[(key, resolution)] = surface
+        return surface
+
+    def sounds(self, wait=True):
+        """
+        The decoded sounds.
+
+        :param wait: Wait for loading to finish, otherwise return the sounds decoded so far.
+        :return: Dictionary of sound key -> pg.mixer.Sound.
+        """
+        if wait:
+            self.wait()
+        if self.done:
+            return self.sound_dict  # Nothing changes it any more
+        with self.lock:
+            return dict(self.sound_dict)
+
+    def font(self, size, name=None):
+        """
+        A font, created once per name and size.
+
+        :param size: Font size.
+        :param name: Font file, or None for Pygame's default font.
+        """
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = pg.font.Font(name, size)
+            self.fonts[(name, size)] = font
+        return font
+
+
+# The game's assets, shared by the game, the HUD, the buckets' sounds and the benchmarks
+shared = AssetManager()
@@ -1,54 +1,133 @@
+import math
+import time
 import pygame as pg
-from settings import RES
-import pymunk 
+from settings import AUDIO_CHANNELS, SOUND_MIN_INTERVAL
+import assets
+from assets import SOUND_FILES
+
+# Mixer channels each sound may use at once. Whatever is left of
+# AUDIO_CHANNELS goes to the bucket hits, which come in bursts
+SOUND_CHANNELS = {
+    "complete_level": 1,
+    "explosion": 1,
+    "start_game": 1,
+}
 
 
 class Sound:
-    def __init__(self) -> None:
-        pg.init()
-        pg.mixer.init()
-
-
-        self.sound_dict = {
-                "complete_level": pg.mixer.Sound('./sound/finish_level.wav'),
-                "explosion": pg.mixer.Sound('./sound/bucket_explode.wav'),
-                "start_game": pg.mixer.Sound('./sound/start_game.wav'),
-                "hit_bucket": pg.mixer.Sound('./sound/hit_bucket.wav')
-            }   
-
-        self.channels = {
-            "explosion": pg.mixer.Channel(0),
-            "bucket_hit": pg.mixer.Channel(1),
-            "level_complete": pg.mixer.Channel(2)
-        }
-    # playing the sound of using mixer 
-    def play_sound(self, sound_key, volume=1.0):
+    """
+    The audio service of the game. Sounds are queued with play_sound() and
+    played by flush() once per frame: identical events from the same frame
+    (say, fifty grains landing in a bucket) become one playback, louder
+    than a single event when it has room below full volume, each sound is played at most once per
+    SOUND_MIN_INTERVAL, and every sound has its own small set of channels so
+    audio can never take over the mixer. The sounds themselves come from
+    assets.shared, so they are decoded once in the background; a sound
+    asked for before it is decoded waits in the queue until it is.
+    """
+    def __init__(self, channels=AUDIO_CHANNELS, min_interval=SOUND_MIN_INTERVAL):
+        """
+        Initialize the mixer and start loading the sounds.
+
+        :param channels: Number of mixer channels the game may use.
+        :param min_interval: Seconds between two plays of the same sound.
+        """
+        self.min_interval = min_interval
+        self.pending = {}  # Sound key -> [events queued, loudest volume asked for]
+        self.last_played = {}  # Sound key -> time it last played
+        self.start_game_played = False
+        self.events = 0  # Sound events asked for
+        self.plays = 0  # Sounds actually played
         try:
-            channel = pg.mixer.find_channel()
-            if channel:
-                channel.play(self.sound_dict[sound_key])
-                channel.set_volume(volume)
-        except KeyError:
+            if not pg.mixer.get_init():
+                pg.mixer.init()
+        except pg.error as e:
+            print(f"Sound disabled: {e}")
+            self.channels = {}
+            return
+        assets.shared.start()
+
+        # Hand out the channel budget, reserved so nothing else grabs them
+        pg.mixer.set_num_channels(channels)
+        pg.mixer.set_reserved(channels)
+        self.channels = {}
+        number = 0
+        for key, count in SOUND_CHANNELS.items():
+            self.channels[key] = [pg.mixer.Channel(number + i) for i in range(count)]
+            number += count
+        self.channels["hit_bucket"] = [pg.mixer.Channel(i) for i in range(number, max(channels, number + 1))]
+
+    # queuing a sound, it is played by the next flush()
+    def play_sound(self, sound_key, volume=1.0):
+        if sound_key not in SOUND_FILES:
             print(f"Sound '{sound_key}' not found.")
+            return
+        self.events += 1
+        pending = self.pending.get(sound_key)
+        if pending is None:
+            self.pending[sound_key] = [1, volume]
+        else:
+            pending[0] += 1
+            pending[1] = max(pending[1], volume)
+
+    def flush(self, now=None):
+        """
+        Play the queued sounds, one playback per sound key. Called once per frame.
+
+        :param now: Current time in seconds, defaults to time.perf_counter().
+        :return: Number of sounds played.
+        """
+        if not self.pending:
+            return 0
+        if now is None:
+            now = time.perf_counter()
+        sounds = assets.shared.sounds(wait=False)
+        played = 0
+        for sound_key in list(self.pending):
+            sound = sounds.get(sound_key)
+            if sound is None and not assets.shared.done:
+                continue  # Still being decoded, play it once it is
+            if now - self.last_played.get(sound_key, -math.inf) < self.min_interval:
+                continue  # Too soon, keep collecting events for the next flush
+            count, volume = self.pending.pop(sound_key)
+            if count > 1:
+                # A merged burst plays louder than one event would, up to full volume
+                volume = min(1.0, volume * (1 + math.log2(count) / 2))
+            channel = self.free_channel(sound_key)
+            if channel is not None and sound is not None:
+                channel.play(sound)
+                channel.set_volume(volume)
+                played += 1
+            self.last_played[sound_key] = now
+        self.plays += played
+        return played
+
+    def free_channel(self, sound_key):
+        """
+        A channel of this sound's budget that is not playing, or None if all are busy (or there is no sound).
+        """
+        for channel in self.channels.get(sound_key, ()):
+            if not channel.get_busy():
+                return channel
+        return None
+
 # playing the sound once the bucket explode
     def play_explosion(self):
-        self.play_sound("explosion",2.0)
+        self.play_sound("explosion", 2.0)
 # playing the sound once the level complete
     def play_level_complete(self):
         self.play_sound("complete_level")
 
-# playing the sound once the sugar grain hit the bucket 
+# playing the sound once the sugar grain hit the bucket
     def play_bucket_hit(self):
-       # self.Hit_chanel.play(self.Hit_bucket,num)
         self.play_sound("hit_bucket", 1.0)
-# play a sound once the game start    
+# play a sound once the game start, only the first time it is asked for
     def play_start_game(self):
-        self.play_sound("start_game")
+        if not self.start_game_played:
+            self.start_game_played = True
+            self.play_sound("start_game")
 
-# did not used this as i used instead a flag 
+# did not used this as i used instead a flag
     def stop_specific_sound(self, sound_key):
-        if sound_key in self.channels:
-            self.channels[sound_key].stop() 
-
-        
-
+        for channel in self.channels.get(sound_key, ()):
+            channel.stop()
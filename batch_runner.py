@@ -0,0 +1,109 @@
+#############################################################
+# Module Name: Sugar Pop Batch Runner Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Simulates every level headlessly across a pool of processes
+#############################################################
+import argparse
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from settings import *
+import sim
+
+
+def level_key(level_file):
+    """
+    Sort key that puts level2 before level10.
+    """
+    return [int(n) for n in re.findall(r'\d+', level_file)] or [0]
+
+
+def find_levels(pattern=None):
+    """
+    Find the level files, in level number order.
+    """
+    if pattern is None:
+        pattern = LEVEL_FILE_NAME.replace("X", "*")
+    return sorted(glob.glob(pattern), key=level_key)
+
+
+def run_task(level_file, seed, frames, time_step):
+    """
+    Simulate one level with one seed inside a worker process.
+    Every task builds its own Simulation, so each worker has its own Pymunk space.
+    """
+    results = sim.run_level(level_file, frames, time_step, seed=seed)
+    if results is None:
+        results = {"level": level_file, "seed": seed, "error": "level not found"}
+    results["worker"] = os.getpid()
+    return results
+
+
+def run_batch(level_files, seeds=1, timeout=120.0, rate=PHYSICS_RATE, workers=None):
+    """
+    Run every level with every seed across a process pool.
+
+    :param level_files: List of level files to run.
+    :param seeds: Number of random seeds to run per level.
+    :param timeout: Simulated seconds before a level counts as not completed.
+    :param rate: Physics steps per simulated second.
+    :param workers: Number of worker processes, None for one per core.
+    :return: The list of results and the total wall-clock time.
+    """
+    frames = int(timeout * rate)
+    time_step = 1.0 / rate
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_task, level_file, seed, frames, time_step)
+                   for level_file in level_files for seed in range(seeds)]
+        for future in as_completed(futures):
+            results.append(future.result())
+    wall_time = time.perf_counter() - start
+    results.sort(key=lambda r: (level_key(r["level"]), r["seed"]))
+    return results, wall_time
+
+
+def print_table(results, wall_time):
+    """
+    Print one row per run, then the time spent by each worker and the total throughput.
+    """
+    print(f"{'level':<24} {'seed':>4} {'done':>5} {'completed s':>11} {'frames':>7} {'wall s':>7} {'worker':>7}  grains per bucket")
+    for r in results:
+        if "error" in r:
+            print(f"{r['level']:<24} {r['seed']:>4}  {r['error']}")
+            continue
+        completed = f"{r['simulated_seconds']:.1f}" if r["completed"] else "-"
+        print(f"{os.path.basename(r['level']):<24} {r['seed']:>4} {'yes' if r['completed'] else 'no':>5} {completed:>11} "
+              f"{r['frames']:>7} {r['wall_seconds']:>7.2f} {r['worker']:>7}  {r['bucket_counts']}")
+
+    per_worker = {}
+    for r in results:
+        per_worker[r["worker"]] = per_worker.get(r["worker"], 0.0) + r.get("wall_seconds", 0.0)
+    print()
+    for worker, seconds in sorted(per_worker.items()):
+        print(f"Worker {worker}: {seconds:.2f} s")
+    frames = sum(r.get("frames", 0) for r in results)
+    print(f"Total: {len(results)} runs, {frames} frames in {wall_time:.2f} s ({frames / wall_time:.0f} frames/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate every sugar pop level headlessly")
+    parser.add_argument("levels", nargs="*", help="Level files to run (default: every file in levels/)")
+    parser.add_argument("--seeds", type=int, default=1, help="Random seeds to run per level")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Simulated seconds before giving up on a level")
+    parser.add_argument("--rate", type=float, default=PHYSICS_RATE, help="Physics steps per simulated second")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    level_files = [sim.resolve_level(name) for name in args.levels] or find_levels()
+    results, wall_time = run_batch(level_files, args.seeds, args.timeout, args.rate, args.workers)
+    print_table(results, wall_time)
+
+
+if __name__ == '__main__':
+    main()
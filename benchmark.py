@@ -0,0 +1,608 @@
+#############################################################
+# Module Name: Sugar Pop Benchmark Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Performance benchmarks for the sugar pop game
+#############################################################
+import os
+import argparse
+import gc
+import glob
+import math
+import random
+import time
+import tracemalloc
+
+# Benchmarks run without a window or a sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame as pg
+import pymunk
+from settings import *
+import bucket
+import bucket_counter
+import sugar_grain
+from grain_pool import GrainPool, GRAIN_SIZE, GRAIN_SHAPES
+from particle_pool import ParticlePool
+from grain_renderer import GrainRenderer, RENDER_MODES
+import dynamic_item
+from simulation import Simulation
+
+
+def timed(func, repeat=5):
+    """
+    Run a function several times and return the best time in milliseconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000.0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def make_buckets(space, number_buckets, sensor=False):
+    """
+    Lay out a row of buckets along the bottom of the screen.
+    """
+    spacing = WIDTH / (number_buckets + 1)
+    return [bucket.Bucket(space, spacing * (i + 1), 100, 60, 80, 10 ** 9, sensor=sensor) for i in range(number_buckets)]
+
+
+def scatter_points(number_grains, buckets):
+    """
+    Scatter grain positions over the screen, with roughly half of them inside a bucket.
+    """
+    rnd = random.Random(1)
+    points = []
+    for i in range(number_grains):
+        if i % 2 and buckets:
+            left, right, bottom, top = rnd.choice(buckets).bounds()
+            points.append((rnd.uniform(left, right) * SCALE, rnd.uniform(bottom, top) * SCALE))
+        else:
+            points.append((rnd.uniform(0, WIDTH), rnd.uniform(0, HEIGHT)))
+    return points
+
+
+def make_grains(space, number_grains, buckets):
+    """
+    Create a list of sugar_grain objects, one Python object per grain.
+    """
+    return [sugar_grain.sugar_grain(space, x, y) for x, y in scatter_points(number_grains, buckets)]
+
+
+def make_pool(space, number_grains, buckets):
+    """
+    Create the same grains as make_grains() in a GrainPool.
+    """
+    pool = GrainPool(space)
+    pool.spawn(scatter_points(number_grains, buckets))
+    return pool
+
+
+def bench_bucket_counting(args):
+    """
+    Compare the grain x bucket collect() loop with the vectorized counter.
+    """
+    print(f"{'grains':>8} {'buckets':>8} {'loop ms':>10} {'vector ms':>10} {'speedup':>8}")
+    for number_buckets in args.buckets:
+        for number_grains in args.grains:
+            space = pymunk.Space()
+            buckets = make_buckets(space, number_buckets)
+            grains = make_grains(space, number_grains, buckets)
+            pool = make_pool(pymunk.Space(), number_grains, buckets)
+
+            def loop():
+                for b in buckets:
+                    b.count_reset()
+                for grain in grains:
+                    for b in buckets:
+                        b.collect(grain)
+
+            def vector():
+                for b in buckets:
+                    b.count_reset()
+                pool.sync()
+                bucket_counter.count_grains(buckets, pool.positions, pool.played)
+
+            loop()
+            expected = [b.count for b in buckets]
+            pool.played[:] = False
+            vector()
+            if [b.count for b in buckets] != expected:
+                raise AssertionError("vectorized bucket counts differ from the collect() loop")
+
+            loop_ms = timed(loop, args.repeat)
+            vector_ms = timed(vector, args.repeat)
+            print(f"{number_grains:>8} {number_buckets:>8} {loop_ms:>10.3f} {vector_ms:>10.3f} {loop_ms / vector_ms:>7.1f}x")
+
+
+def bench_grain_render(args):
+    """
+    Compare the per-grain draw() path with the batched grain renderers.
+    """
+    screen = pg.display.set_mode(RES)
+    print(f"{'grains':>8} " + " ".join(f"{mode + ' ms':>14}" for mode in RENDER_MODES))
+    for number_grains in args.grains:
+        space = pymunk.Space()
+        grains = make_pool(space, number_grains, [])
+        times = []
+        for mode in RENDER_MODES:
+            renderer = GrainRenderer(mode)
+            times.append(timed(lambda: renderer.draw(screen, grains), args.repeat))
+        print(f"{number_grains:>8} " + " ".join(f"{ms:>14.3f}" for ms in times))
+
+
+def bench_present(args):
+    """
+    Frame drawing with the full redraw vs the dirty rectangle path, on a level
+    pouring sugar. The dummy video driver makes display.update() nearly free,
+    so the times are the redraw work; the pixels are what a real display gets.
+    """
+    import main
+    print(f"{'path':>8} {'frames':>8} {'draw ms':>10} {'pixels/frame':>14} {'of screen':>10}")
+    for path in ('full', 'dirty'):
+        game = main.Game()
+        game.intro_image = None
+        game.render_path = path
+        game.sim.load_level(LEVEL_FILE_NAME.replace("X", str(args.level)))
+        pixels = []
+        draw_ms = 0.0
+        for frame in range(args.frames):
+            game.alpha = game.sim.advance(1.0 / FPS)
+            start = time.perf_counter()
+            game.draw()
+            draw_ms += (time.perf_counter() - start) * 1000.0
+            pixels.append(game.pixels_pushed)
+        mean = sum(pixels) / len(pixels)
+        print(f"{path:>8} {args.frames:>8} {draw_ms / args.frames:>10.3f} {mean:>14.0f} {mean / (WIDTH * HEIGHT):>9.1%}")
+
+
+# Run in a fresh interpreter by bench_startup, so nothing is loaded or cached yet
+STARTUP_SCRIPT = """
+import sys, time
+import settings
+settings.ASSET_LOADING = sys.argv[1]
+import main, assets
+start = time.perf_counter()
+game = main.Game()
+game.check_events()
+game.update()
+game.draw()
+first_frame = time.perf_counter() - start
+assets.shared.wait()
+game.draw()
+print(first_frame * 1000.0, (time.perf_counter() - start) * 1000.0)
+"""
+
+
+def bench_startup(args):
+    """
+    Time to the first frame on the screen, from creating the Game, with the
+    assets decoded before it vs on the background thread. Every run is a new
+    Python process, so no image or sound is cached yet; the imports are left out.
+    """
+    import subprocess
+    import sys
+    print(f"{'loading':>12} {'first frame ms':>15} {'intro shown ms':>15}")
+    for mode in ('blocking', 'background'):
+        runs = []
+        for _ in range(args.repeat):
+            out = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, mode], capture_output=True, text=True,
+                                 check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+            runs.append((float(out[-2]), float(out[-1])))
+        first_frame, intro = (min(column) for column in zip(*runs))
+        print(f"{mode:>12} {first_frame:>15.1f} {intro:>15.1f}")
+
+
+def allocated(build):
+    """
+    Measure the memory held by whatever build() returns, in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def bench_grain_memory(args):
+    """
+    Compare the memory and spawn time of a list of sugar_grain objects with a
+    GrainPool and a ParticlePool. A GrainPool grain still owns a Pymunk body and
+    shape, which are most of its memory; only particles do without them.
+    """
+    print(f"{'grains':>8} {'list B/grain':>13} {'pool B/grain':>13} {'particle B/grain':>17} "
+          f"{'list ms':>9} {'pool ms':>9} {'particle ms':>12}")
+    for number_grains in args.grains:
+        points = scatter_points(number_grains, [])
+
+        def build_list():
+            space = pymunk.Space()
+            return space, [sugar_grain.sugar_grain(space, x, y) for x, y in points]
+
+        def build_pool():
+            space = pymunk.Space()
+            pool = GrainPool(space)
+            pool.spawn(points)
+            return space, pool
+
+        def build_particles():
+            space = pymunk.Space()
+            pool = ParticlePool(space)
+            pool.spawn(points)
+            return space, pool
+
+        list_bytes = allocated(build_list)
+        pool_bytes = allocated(build_pool)
+        particle_bytes = allocated(build_particles)
+        list_ms = timed(build_list, args.repeat)
+        pool_ms = timed(build_pool, args.repeat)
+        particle_ms = timed(build_particles, args.repeat)
+        print(f"{number_grains:>8} {list_bytes / number_grains:>13.1f} {pool_bytes / number_grains:>13.1f} "
+              f"{particle_bytes / number_grains:>17.1f} {list_ms:>9.2f} {pool_ms:>9.2f} {particle_ms:>12.2f}")
+
+
+def scan_explode(explode_bucket, grains):
+    """
+    The original Bucket.explode: walk every grain and test its distance in Python.
+    """
+    center_x = (explode_bucket.left_wall.a[0] + explode_bucket.right_wall.a[0]) / 2
+    center_y = (explode_bucket.left_wall.a[1] + explode_bucket.left_wall.b[1]) / 2
+    for body in grains.bodies:
+        dx = body.position.x - center_x
+        dy = body.position.y - center_y
+        distance = math.sqrt(dx ** 2 + dy ** 2)
+        if distance < 2:
+            if distance > 0:
+                dx /= distance
+                dy /= distance
+            impulse_magnitude = 20 / (distance + 0.1)
+            body.apply_impulse_at_world_point((dx * impulse_magnitude, dy * impulse_magnitude), body.position)
+    explode_bucket.space.remove(explode_bucket.left_wall, explode_bucket.right_wall, explode_bucket.bottom_wall)
+    explode_bucket.exploded = True
+
+
+def bench_explode(args):
+    """
+    Measure the latency of one bucket explosion: scanning every grain vs a space query.
+    """
+    print(f"{'grains':>8} {'hit':>6} {'scan ms':>10} {'query ms':>10} {'speedup':>8}")
+    for number_grains in args.grains:
+        times = {}
+        velocities = {}
+        for name in ("scan", "query"):
+            best = None
+            for _ in range(args.repeat):
+                space = pymunk.Space()
+                explode_bucket = make_buckets(space, 1)[0]
+                # A full bucket in the middle of a level full of grains
+                grains = make_pool(space, args.in_bucket * 2, [explode_bucket])
+                grains.spawn(scatter_points(number_grains - len(grains), []))
+                start = time.perf_counter()
+                if name == "scan":
+                    scan_explode(explode_bucket, grains)
+                else:
+                    explode_bucket.explode()
+                elapsed = (time.perf_counter() - start) * 1000.0
+                best = elapsed if best is None else min(best, elapsed)
+            times[name] = best
+            velocities[name] = [tuple(body.velocity) for body in grains.bodies]
+        if not np.allclose(velocities["scan"], velocities["query"]):
+            raise AssertionError("query explosion pushed the grains differently from the scan")
+        hit = sum(1 for v in velocities["query"] if v != (0, 0))
+        print(f"{number_grains:>8} {hit:>6} {times['scan']:>10.3f} {times['query']:>10.3f} {times['scan'] / times['query']:>7.1f}x")
+
+
+def scribble(rnd, y, points):
+    """
+    A wavy hand-drawn stroke across the screen, in Pygame coordinates.
+    """
+    stroke = []
+    for i in range(points):
+        x = 50 + i * (WIDTH - 100) / points
+        stroke.append((x + rnd.uniform(-1, 1), y + 40 * math.sin(x / 120) + rnd.uniform(-1, 1)))
+    return stroke
+
+
+def bench_lines(args):
+    """
+    Compare physics step time with raw user strokes and with simplified strokes.
+    """
+    print(f"{'tolerance':>9} {'segments':>9} {'step ms':>9}")
+    for tolerance in args.tolerance:
+        space = pymunk.Space()
+        space.gravity = (0, -9)
+        rnd = random.Random(2)
+        lines = []
+        for y in range(200, HEIGHT - 100, HEIGHT // (args.strokes + 1)):
+            line = dynamic_item.DynamicItem(space, tolerance=tolerance, max_segments=None)
+            for x, py in scribble(rnd, y, args.points):
+                line.add_vertex(x, py)
+            line.finish()
+            lines.append(line)
+        # Rain grains onto the lines
+        grains = GrainPool(space)
+        grains.spawn([(rnd.uniform(0, WIDTH), rnd.uniform(HEIGHT / 2, HEIGHT)) for _ in range(args.grains)])
+        for _ in range(60):
+            space.step(PHYSICS_TIME_STEP)
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            space.step(PHYSICS_TIME_STEP)
+        step_ms = (time.perf_counter() - start) * 1000.0 / args.steps
+        print(f"{tolerance:>9} {sum(len(line.segments) for line in lines):>9} {step_ms:>9.3f}")
+
+
+def full_bucket(number_grains, sleeping, freeze, hash_cell=None, threads=1, grain_shape='box'):
+    """
+    A simulation with one wide bucket and a pile of grains dropped into it.
+
+    :param hash_cell: Use a spatial hash with cells this many grains wide, None for the BB tree.
+    :param threads: Solver threads.
+    :param grain_shape: 'box', 'circle' or 'particle'.
+    """
+    sim = Simulation(adaptive=False, threads=threads, grain_shape=grain_shape)
+    if hash_cell:
+        sim.space.use_spatial_hash(GRAIN_SIZE * hash_cell, max(1000, number_grains * SPATIAL_HASH_CELLS_PER_GRAIN))
+    if not sleeping:
+        sim.space.sleep_time_threshold = float('inf')
+    sim.freeze_settled = freeze
+    sim.build_main_walls()
+    sim.buckets.append(bucket.Bucket(sim.space, WIDTH / 2, 150, 300, 250, 10 ** 9, sensor=sim.sensors is not None))
+    if sim.sensors:
+        sim.sensors.add(sim.buckets[0])
+    columns = 100
+    sim.sugar_grains.spawn([(WIDTH / 2 - 140 + 2.8 * (i % columns), 300 + 2.8 * (i // columns)) for i in range(number_grains)])
+    return sim
+
+
+def bench_settle(args):
+    """
+    Step time of a bucket full of settled grains: always awake, sleeping, and sleeping plus frozen.
+    """
+    print(f"{'grains':>8} {'mode':>8} {'live':>6} {'frozen':>7} {'count':>6} {'step ms':>9}")
+    for number_grains in args.grains:
+        for mode, sleeping, freeze in (("awake", False, False), ("sleep", True, False), ("freeze", True, True)):
+            sim = full_bucket(number_grains, sleeping, freeze)
+            for _ in range(args.settle):
+                sim.step()
+            start = time.perf_counter()
+            for _ in range(args.steps):
+                sim.step()
+            step_ms = (time.perf_counter() - start) * 1000.0 / args.steps
+            full = sim.buckets[0]
+            print(f"{number_grains:>8} {mode:>8} {len(sim.sugar_grains):>6} {full.frozen_count:>7} {full.count:>6} {step_ms:>9.3f}")
+
+
+def bench_grain_shapes(args):
+    """
+    Step time and the shape of the pile with box, circle and particle grains
+    dropped into a wide bucket: while they fall and pile up, and once the pile
+    has settled (where Pymunk lets the grains sleep).
+    """
+    print(f"{'grains':>8} {'shape':>9} {'fall ms':>9} {'vs box':>7} {'rest ms':>9} {'vs box':>7} "
+          f"{'in bucket':>10} {'pile height':>12} {'spread':>7} {'resting':>8}")
+    for number_grains in args.grains:
+        box_ms = None
+        for shape in args.shapes:
+            sim = full_bucket(number_grains, True, False, grain_shape=shape)
+            start = time.perf_counter()
+            for _ in range(args.settle):
+                sim.step()
+            fall_ms = (time.perf_counter() - start) * 1000.0 / args.settle
+            start = time.perf_counter()
+            for _ in range(args.steps):
+                sim.step()
+            rest_ms = (time.perf_counter() - start) * 1000.0 / args.steps
+            box_ms = box_ms or (fall_ms, rest_ms)
+            grains = sim.sugar_grains
+            left, right, bottom, top = sim.buckets[0].bounds()
+            positions = grains.positions
+            inside = bucket_counter.inside_mask(positions, np.array([[left, right, bottom, top]]))[0]
+            # Pile height above the bucket floor, and how far the grains spread sideways, in meters
+            height = np.percentile(positions[inside, 1], 95) - bottom if inside.any() else 0.0
+            spread = positions[:, 0].std() if len(positions) else 0.0
+            speed = np.hypot(*(positions - grains.interpolated(0.0)).T) / sim.time_step
+            resting = (speed < IDLE_SPEED_THRESHOLD).mean() if len(positions) else 0.0
+            print(f"{number_grains:>8} {shape:>9} {fall_ms:>9.3f} {box_ms[0] / fall_ms:>6.2f}x {rest_ms:>9.3f} {box_ms[1] / rest_ms:>6.2f}x "
+                  f"{int(inside.sum()):>10} "
+                  f"{height:>12.2f} {spread:>7.2f} {resting:>8.0%}")
+
+
+def bench_broadphase(args):
+    """
+    Step time of a bucket pile plus falling grains with the BB tree vs spatial hashes of several cell sizes.
+    """
+    print(f"{'grains':>8} {'broadphase':>12} {'step ms':>9} {'vs tree':>8}")
+    for number_grains in args.grains:
+        tree_ms = None
+        for cell in [None] + args.cells:
+            # Keep the grains awake so every step does the full broadphase work
+            sim = full_bucket(number_grains, sleeping=False, freeze=False, hash_cell=cell)
+            for _ in range(args.settle):
+                sim.step()
+            start = time.perf_counter()
+            for _ in range(args.steps):
+                sim.step()
+            step_ms = (time.perf_counter() - start) * 1000.0 / args.steps
+            tree_ms = tree_ms or step_ms
+            name = "tree" if cell is None else f"hash x{cell:g}"
+            print(f"{number_grains:>8} {name:>12} {step_ms:>9.3f} {tree_ms / step_ms:>7.2f}x")
+
+
+def bench_threads(args):
+    """
+    Step time of a pile of awake grains with 1 to N solver threads.
+    """
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"{'grains':>8} {'threads':>8} {'step ms':>9} {'speedup':>8} {'counts':>s}")
+    for number_grains in args.grains:
+        single_ms = None
+        for threads in range(1, args.threads + 1):
+            sim = full_bucket(number_grains, sleeping=False, freeze=False, threads=threads)
+            for _ in range(args.settle):
+                sim.step()
+            start = time.perf_counter()
+            for _ in range(args.steps):
+                sim.step()
+            step_ms = (time.perf_counter() - start) * 1000.0 / args.steps
+            single_ms = single_ms or step_ms
+            counts = [b.count for b in sim.buckets]
+            print(f"{number_grains:>8} {threads:>8} {step_ms:>9.3f} {single_ms / step_ms:>7.2f}x {counts}")
+
+    # The shipped levels as they are played: the spout pouring, grains piling up in the buckets
+    print(f"\n{'level':>22} {'grains':>7} {'threads':>8} {'step ms':>9} {'speedup':>8}")
+    for level_file in sorted(glob.glob(LEVEL_FILE_NAME.replace("X", "*"))):
+        single_ms = None
+        for threads in range(1, args.threads + 1):
+            sim = Simulation(adaptive=False, threads=threads)
+            sim.load_level(level_file)
+            start = time.perf_counter()
+            for _ in range(args.level_steps):
+                sim.step()
+            step_ms = (time.perf_counter() - start) * 1000.0 / args.level_steps
+            single_ms = single_ms or step_ms
+            print(f"{os.path.basename(level_file):>22} {len(sim.sugar_grains):>7} {threads:>8} {step_ms:>9.3f} {single_ms / step_ms:>7.2f}x")
+
+
+def bench_count_mode(args):
+    """
+    Step time with the bucket counts polled every BUCKET_CHECK_INTERVAL vs kept by sensor events.
+    """
+    print(f"{'grains':>8} {'buckets':>8} {'mode':>7} {'step ms':>9} {'counts':>s}")
+    for number_buckets in args.buckets:
+        for number_grains in args.grains:
+            for mode in ('poll', 'sensor'):
+                sim = Simulation(adaptive=False, count_mode=mode)
+                sim.build_main_walls()
+                sim.buckets = make_buckets(sim.space, number_buckets, sensor=mode == 'sensor')
+                if sim.sensors:
+                    for b in sim.buckets:
+                        sim.sensors.add(b)
+                sim.sugar_grains.spawn(scatter_points(number_grains, sim.buckets))
+                for _ in range(args.settle):
+                    sim.step()
+                start = time.perf_counter()
+                for _ in range(args.steps):
+                    sim.step()
+                step_ms = (time.perf_counter() - start) * 1000.0 / args.steps
+                sim.update_buckets()  # Poll once more so both modes report the current counts
+                counts = [b.count for b in sim.buckets]
+                print(f"{number_grains:>8} {number_buckets:>8} {mode:>7} {step_ms:>9.3f} {counts}")
+
+
+def bench_recycle(args):
+    """
+    Spawn and delete grains over and over, allocating new bodies each time vs reusing the free list.
+    """
+    print(f"{'grains':>8} {'fresh ms':>10} {'recycle ms':>11} {'speedup':>8}")
+    for number_grains in args.grains:
+        points = scatter_points(number_grains, [])
+        times = []
+        for recycle in (False, True):
+            pool = GrainPool(pymunk.Space())
+
+            def churn():
+                for _ in range(args.rounds):
+                    if not recycle:
+                        pool.free = []
+                    pool.spawn(points)
+                    pool.delete(np.arange(len(pool)))
+            churn()  # Fill the free list first
+            times.append(timed(churn, args.repeat))
+        print(f"{number_grains:>8} {times[0]:>10.2f} {times[1]:>11.2f} {times[0] / times[1]:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sugar Pop performance benchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, the best one is reported")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("buckets", help="Bucket counting: collect() loop vs vectorized counter")
+    p.add_argument("--grains", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    p.add_argument("--buckets", type=int, nargs="+", default=[1, 4, 16])
+    p.set_defaults(func=bench_bucket_counting)
+
+    p = sub.add_parser("render", help="Grain drawing: per-object draw() vs batched renderers")
+    p.add_argument("--grains", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    p.set_defaults(func=bench_grain_render)
+
+    p = sub.add_parser("present", help="Frame drawing: full redraw vs dirty rectangles")
+    p.add_argument("--level", type=int, default=1)
+    p.add_argument("--frames", type=int, default=600)
+    p.set_defaults(func=bench_present)
+
+    p = sub.add_parser("startup", help="Time to first frame: assets loaded up front vs in the background")
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("memory", help="Grain storage: list of sugar_grain objects vs GrainPool vs ParticlePool")
+    p.add_argument("--grains", type=int, nargs="+", default=[1000, 10000, 50000])
+    p.set_defaults(func=bench_grain_memory)
+
+    p = sub.add_parser("explode", help="Bucket explosion latency: grain scan vs space query")
+    p.add_argument("--grains", type=int, nargs="+", default=[1000, 10000, 50000])
+    p.add_argument("--in-bucket", type=int, default=100, help="Grains sitting in the exploding bucket")
+    p.set_defaults(func=bench_explode)
+
+    p = sub.add_parser("lines", help="Physics step time with raw vs simplified drawn lines")
+    p.add_argument("--tolerance", type=float, nargs="+", default=[0, 1, 2, 4], help="Pixels, 0 keeps the raw stroke")
+    p.add_argument("--strokes", type=int, default=6)
+    p.add_argument("--points", type=int, default=200, help="Mouse samples per stroke")
+    p.add_argument("--grains", type=int, default=2000)
+    p.add_argument("--steps", type=int, default=120)
+    p.set_defaults(func=bench_lines)
+
+    p = sub.add_parser("settle", help="Step time of a full bucket: awake vs sleeping vs frozen grains")
+    p.add_argument("--grains", type=int, nargs="+", default=[1000, 3000])
+    p.add_argument("--settle", type=int, default=900, help="Steps to let the pile settle first")
+    p.add_argument("--steps", type=int, default=120)
+    p.set_defaults(func=bench_settle)
+
+    p = sub.add_parser("shapes", help="Step time and pile shape with box, circle and particle grains")
+    p.add_argument("--grains", type=int, nargs="+", default=[1000, 3000, 10000])
+    p.add_argument("--shapes", nargs="+", choices=GRAIN_SHAPES, default=list(GRAIN_SHAPES))
+    p.add_argument("--settle", type=int, default=600, help="Steps to let the pile settle first")
+    p.add_argument("--steps", type=int, default=60)
+    p.set_defaults(func=bench_grain_shapes)
+
+    p = sub.add_parser("broadphase", help="Step time with the BB tree vs a spatial hash")
+    p.add_argument("--grains", type=int, nargs="+", default=[500, 2000, 5000])
+    p.add_argument("--cells", type=float, nargs="+", default=[1, 2, 4], help="Hash cell sizes to try, in grain sizes")
+    p.add_argument("--settle", type=int, default=120, help="Steps to run before timing")
+    p.add_argument("--steps", type=int, default=60)
+    p.set_defaults(func=bench_broadphase)
+
+    p = sub.add_parser("threads", help="Step time with 1 to N physics solver threads")
+    p.add_argument("--grains", type=int, nargs="+", default=[2000, 5000])
+    p.add_argument("--threads", type=int, default=2, help="Highest thread count to try (Pymunk uses at most 2)")
+    p.add_argument("--settle", type=int, default=120, help="Steps to run before timing")
+    p.add_argument("--steps", type=int, default=60)
+    p.add_argument("--level-steps", type=int, default=3600, help="Steps to play each shipped level for (60 s of game time)")
+    p.set_defaults(func=bench_threads)
+
+    p = sub.add_parser("count", help="Step time with polled vs sensor bucket counting")
+    p.add_argument("--grains", type=int, nargs="+", default=[1000, 5000])
+    p.add_argument("--buckets", type=int, nargs="+", default=[1, 4, 16])
+    p.add_argument("--settle", type=int, default=120, help="Steps to run before timing")
+    p.add_argument("--steps", type=int, default=120)
+    p.set_defaults(func=bench_count_mode)
+
+    p = sub.add_parser("recycle", help="Grain spawning: new bodies vs the GrainPool free list")
+    p.add_argument("--grains", type=int, nargs="+", default=[100, 1000, 5000])
+    p.add_argument("--rounds", type=int, default=10, help="Spawn and delete cycles per measurement")
+    p.set_defaults(func=bench_recycle)
+
+    args = parser.parse_args()
+    pg.init()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,16 +6,40 @@
 # Description: The bucket implementation of the sugar pop game
 #############################################################
 
+import numpy as np
 import pygame as pg
 import pymunk
 import time
-from settings import SCALE, HEIGHT, WIDTH
-from math import sqrt
+from settings import SCALE, HEIGHT, WIDTH, BOX_COLLISION_TYPE, BUCKET_SENSOR_CATEGORY, GRAIN_CATEGORY, GRAIN_COLLISION_TYPE
 from audio import *
+from grain_pool import GRAIN_QUERY_FILTER, GRAIN_SIZE
+from grain_renderer import GRAIN_COLOR
+
+EXPLOSION_RADIUS = 2  # Grains closer than this to the bucket center get blown away
+# The sensor only touches grains, and grain queries don't find it
+SENSOR_FILTER = pymunk.ShapeFilter(categories=BUCKET_SENSOR_CATEGORY, mask=GRAIN_CATEGORY)
+
+
+def blast_impulses(positions, center):
+    """
+    The push an explosion gives the grains around it.
+
+    :param positions: Array of shape (N, 2) with the grain positions.
+    :param center: Center of the explosion.
+    :return: Mask of the grains inside EXPLOSION_RADIUS and the (N, 2) impulses.
+    """
+    offsets = positions - center
+    distance = np.sqrt(offsets[:, 0] ** 2 + offsets[:, 1] ** 2)
+    near = distance < EXPLOSION_RADIUS
+
+    # Normalize the vectors, leaving a grain right on the center alone
+    direction = np.divide(offsets, distance[:, None], out=np.zeros_like(offsets), where=distance[:, None] > 0)
+    # Apply a radial impulse (adjust magnitude as needed), reducing force with distance
+    return near, direction * (20 / (distance + 0.1))[:, None]
 
 
 class Bucket:
-    def __init__(self, space, x, y, width, height, needed_sugar):
+    def __init__(self, space, x, y, width, height, needed_sugar, sound=None, sensor=False, aabb=None):
         """
         Initialize the bucket with an open top by creating three static segments 
         for each wall (left, right, bottom).
@@ -25,38 +49,55 @@ class Bucket:
         :param y: Y position of the bucket's top in Pygame coordinates.
         :param width: Width of the bucket in pixels.
         :param height: Height of the bucket in pixels.
+        :param needed_sugar: Number of grains that make the bucket explode.
+        :param sound: The shared Sound to play effects on, or None to stay silent.
+        :param sensor: Add a sensor shape over the inside of the bucket so grains
+                       can be counted from collision events (see BucketSensors).
+        :param aabb: Bounds of the bucket in Pymunk units as worked out when the level
+                     was saved (left, right, bottom, top), or None to work them out here.
         """
         self.space = space
         self.width = width / SCALE
         self.height = height / SCALE
         self.count = 0  # Counter for collected sugar grains
         self.needed_sugar = needed_sugar
-        self.sound = Sound()  # loading the sound class
+        self.sound = sound
         wall_thickness = 0.2  # Thickness of the walls in physics units
+        self.wall_thickness = wall_thickness
+        # Settled grains turned into a static fill instead of live bodies
+        self.frozen_count = 0
+        self.fill_top = None
+        self.fill_shape = None
+        self.settled_time = 0.0  # How long every grain in the bucket has been asleep
+        self.grains_inside = 0  # Live grains touching the sensor
 
-        # Convert Pygame coordinates to Pymunk coordinates
-        x_pymunk = x / SCALE
-        y_pymunk = y / SCALE # (HEIGHT - y) / SCALE  # Adjust y-coordinate for Pymunk's coordinate system
+        if aabb is None:
+            # Convert Pygame coordinates to Pymunk coordinates
+            x_pymunk = x / SCALE
+            y_pymunk = y / SCALE # (HEIGHT - y) / SCALE  # Adjust y-coordinate for Pymunk's coordinate system
+            aabb = (x_pymunk - self.width / 2, x_pymunk + self.width / 2, y_pymunk - self.height / 2, y_pymunk + self.height / 2)
+        self.aabb = tuple(aabb)
+        left, right, bottom, top = self.aabb
 
         # Left wall
-        left_wall_start = (x_pymunk - self.width / 2, y_pymunk - self.height / 2)
-        left_wall_end = (x_pymunk - self.width / 2, y_pymunk + self.height / 2)
+        left_wall_start = (left, bottom)
+        left_wall_end = (left, top)
         self.left_wall = pymunk.Segment(space.static_body, left_wall_start, left_wall_end, wall_thickness)
         self.left_wall.friction = 0.5
         self.left_wall.elasticity = 0.5
         space.add(self.left_wall)
 
         # Right wall
-        right_wall_start = (x_pymunk + self.width / 2, y_pymunk - self.height / 2)
-        right_wall_end = (x_pymunk + self.width / 2, y_pymunk + self.height / 2)
+        right_wall_start = (right, bottom)
+        right_wall_end = (right, top)
         self.right_wall = pymunk.Segment(space.static_body, right_wall_start, right_wall_end, wall_thickness)
         self.right_wall.friction = 0.5
         self.right_wall.elasticity = 0.5
         space.add(self.right_wall)
 
         # Bottom wall
-        bottom_wall_start = (x_pymunk - self.width / 2, y_pymunk - self.height / 2)
-        bottom_wall_end = (x_pymunk + self.width / 2, y_pymunk - self.height / 2)
+        bottom_wall_start = (left, bottom)
+        bottom_wall_end = (right, bottom)
         self.bottom_wall = pymunk.Segment(space.static_body, bottom_wall_start, bottom_wall_end, wall_thickness)
         self.bottom_wall.friction = 0.5
         self.bottom_wall.elasticity = 0.5
@@ -65,59 +106,80 @@ class Bucket:
         self.exploded = False  # Track if the bucket has exploded
         self.last_grain_time = None # track the last grain
 
+        # Sensor over the bucket, shrunk by half a grain so a grain touches it
+        # about when its center is inside the bounds, like the polled count
+        self.sensor = None
+        if sensor:
+            left, right, bottom, top = self.bounds()
+            inset = GRAIN_SIZE / 2
+            self.sensor = pymunk.Poly(space.static_body, [(left + inset, bottom + inset), (right - inset, bottom + inset),
+                                                          (right - inset, top - inset), (left + inset, top - inset)])
+            self.sensor.sensor = True
+            self.sensor.collision_type = BOX_COLLISION_TYPE
+            self.sensor.filter = SENSOR_FILTER
+            space.add(self.sensor)
+
         #self.sugar_grains = []  # Track sugar grains inside the bucket(i dont need this)
 
     
 
-    def explode(self, grains):
+    def explode(self):
         """
         Apply a radial force to all grains near the bucket and remove the bucket walls.
-        
-        :param grains: List of sugar grain objects in the game.
+        The grains are found with a query on the space rather than by scanning every grain.
         """
         if self.exploded:
             return  # Prevent multiple explosions
         # playing the explosion sound when the bucket explod
-        self.sound.play_explosion()
-
-        # Get the bucket's center position
-        bucket_center_x = (self.left_wall.a[0] + self.right_wall.a[0]) / 2
-        bucket_center_y = (self.left_wall.a[1] + self.left_wall.b[1]) / 2
-
-        # Apply radial force to each grain
-        for grain in grains:
-            grain_pos = grain.body.position
-
-            # Calculate the vector from the bucket center to the grain
-            dx = grain_pos.x - bucket_center_x
-            dy = grain_pos.y - bucket_center_y
-            distance = sqrt(dx**2 + dy**2)
-
-            if distance < 2:  # Only affect grains within a certain radius
-                # Normalize the vector
-                if distance > 0:
-                    dx /= distance
-                    dy /= distance
+        if self.sound:
+            self.sound.play_explosion()
 
-                # Apply a radial impulse (adjust magnitude as needed)
-                impulse_magnitude = 20 / (distance + 0.1)  # Reduce force with distance
-                impulse = (dx * impulse_magnitude, dy * impulse_magnitude)
-                grain.body.apply_impulse_at_world_point(impulse, grain.body.position)
+        # Keep only the grains whose center is inside the blast radius
+        center = np.array(self.center())
+        bodies = self.grains_near(EXPLOSION_RADIUS)
+        if bodies:
+            near, impulses = blast_impulses(np.array([tuple(body.position) for body in bodies]), center)
+            for i in np.flatnonzero(near):
+                body = bodies[i]
+                body.apply_impulse_at_world_point(tuple(impulses[i]), body.position)
 
         # Remove the bucket walls
         self.space.remove(self.left_wall, self.right_wall, self.bottom_wall)
+        self.remove_fill()
          
 
         self.exploded = True  # Mark the bucket as exploded
+        self.remove_sensor()  # After exploded is set, so the count stays as it was
         
 
         
+    def grains_near(self, radius):
+        """
+        Bodies of the grains in a box around the bucket's center, found with the space's spatial index.
+
+        :param radius: Half the size of the box, in Pymunk units.
+        :return: List of grain bodies.
+        """
+        x, y = self.center()
+        box = pymunk.BB(x - radius, y - radius, x + radius, y + radius)
+        return [shape.body for shape in self.space.bb_query(box, GRAIN_QUERY_FILTER)
+                if shape.collision_type == GRAIN_COLLISION_TYPE]
+
+    def center(self):
+        """
+        Center of the bucket in Pymunk coordinates, where it explodes from.
+        """
+        return (self.left_wall.a[0] + self.right_wall.a[0]) / 2, (self.left_wall.a[1] + self.left_wall.b[1]) / 2
+
     def draw(self, screen):
         """
-        Draw the bucket with an open top on the Pygame screen.
+        Draw the bucket with an open top on the Pygame screen, and the frozen
+        grains, if any, as a solid fill in the grain color.
+
+        :return: Number of draw calls made.
         """
         if self.exploded:
-            return  # Don't draw if the bucket has exploded
+            return 0  # Don't draw if the bucket has exploded
 
         color = (144, 238, 144)  # Light green color
 
@@ -129,10 +191,88 @@ class Bucket:
         pg.draw.line(screen, color, to_pygame(self.left_wall.a), to_pygame(self.left_wall.b), 2)
         pg.draw.line(screen, color, to_pygame(self.right_wall.a), to_pygame(self.right_wall.b), 2)
         pg.draw.line(screen, color, to_pygame(self.bottom_wall.a), to_pygame(self.bottom_wall.b), 2)
+        if self.fill_top is None:
+            return 3
+        left, right, bottom = self.interior()
+        top_left = to_pygame((left, self.fill_top))
+        bottom_right = to_pygame((right, bottom))
+        pg.draw.rect(screen, GRAIN_COLOR, pg.Rect(top_left, (bottom_right[0] - top_left[0], bottom_right[1] - top_left[1])))
+        return 4
+
+    def bounds(self):
+        """
+        Get the bounding box of the bucket in Pymunk coordinates.
+
+        :return: Tuple of (left, right, bottom, top).
+        """
+        return self.aabb
 
     def count_reset(self):
         if not self.exploded:
-            self.count = 0
+            self.count = self.frozen_count  # Frozen grains are still in the bucket
+
+    def update_count(self):
+        """
+        Set the count from the sensor: grains touching it plus the frozen ones.
+        """
+        if not self.exploded:
+            self.count = self.frozen_count + self.grains_inside
+
+    def interior(self):
+        """
+        Get the space inside the walls of the bucket in Pymunk coordinates.
+
+        :return: Tuple of (left, right, bottom).
+        """
+        left, right, bottom, top = self.bounds()
+        return left + self.wall_thickness, right - self.wall_thickness, bottom + self.wall_thickness
+
+    def freeze(self, positions):
+        """
+        Turn settled grains into part of the bucket: they are counted in
+        frozen_count and replaced by one static box filling the bucket up to
+        the top of the highest of them. The caller removes the grain bodies.
+
+        :param positions: Array of shape (N, 2) with the positions of the grains to freeze.
+        """
+        if not len(positions):
+            return
+        self.frozen_count += len(positions)
+        top = float(positions[:, 1].max()) + GRAIN_SIZE / 2
+        if self.fill_top is not None:
+            top = max(top, self.fill_top)
+        self.remove_fill()
+
+        left, right, bottom = self.interior()
+        self.fill_shape = pymunk.Poly(self.space.static_body, [(left, bottom), (right, bottom), (right, top), (left, top)])
+        self.fill_shape.friction = 0.5
+        self.fill_shape.elasticity = 0.5
+        self.space.add(self.fill_shape)
+        self.fill_top = top
+
+    def thaw(self):
+        """
+        Remove the static fill so the frozen grains can be put back as live bodies.
+
+        :return: Tuple of the number of frozen grains and the top of the fill.
+        """
+        count, top = self.frozen_count, self.fill_top
+        self.remove_fill()
+        self.frozen_count = 0
+        if self.sensor is not None:
+            self.update_count()
+        return count, top
+
+    def remove_sensor(self):
+        if self.sensor is not None:
+            self.space.remove(self.sensor)
+            self.sensor = None
+
+    def remove_fill(self):
+        if self.fill_shape is not None:
+            self.space.remove(self.fill_shape)
+            self.fill_shape = None
+            self.fill_top = None
         
     def collect(self, sugar_grain):
         """
@@ -145,16 +285,14 @@ class Bucket:
 
         grain_pos = sugar_grain.body.position
         # Get bucket boundaries
-        left = self.left_wall.a[0]
-        right = self.right_wall.a[0]
-        bottom = self.bottom_wall.a[1]
-        top = self.left_wall.b[1]
+        left, right, bottom, top = self.bounds()
 
         # Check if the grain's position is within the bucket's bounding box
         if left <= grain_pos.x <= right and bottom <= grain_pos.y <= top:
                 self.count += 1
                 if not sugar_grain.played:  # Only play sound if not already played 
-                    self.sound.play_bucket_hit()
+                    if self.sound:
+                        self.sound.play_bucket_hit()
                     sugar_grain.played = True # indicate the sound has been played
                 return True  # indicate that the grain was collected
         else:
@@ -162,6 +300,8 @@ class Bucket:
             return False  # Grain not collected
 
     def delete(self):
+        self.remove_fill()
+        self.remove_sensor()
         if not self.exploded:
             # Remove the bucket walls
             self.space.remove(self.left_wall, self.right_wall, self.bottom_wall)
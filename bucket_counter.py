@@ -0,0 +1,131 @@
+#############################################################
+# Module Name: Sugar Pop Bucket Counter Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Vectorized counting of sugar grains inside the buckets
+#############################################################
+import numpy as np
+from settings import GRAIN_COLLISION_TYPE, BOX_COLLISION_TYPE
+
+COUNT_MODES = ('sensor', 'poll')
+
+
+def bucket_bounds(buckets):
+    """
+    Gather the bounding boxes of all buckets into a single array.
+
+    :param buckets: Sequence of Bucket objects.
+    :return: Array of shape (M, 4) with left, right, bottom and top of every bucket.
+    """
+    bounds = np.empty((len(buckets), 4), dtype=np.float64)
+    for i, bucket in enumerate(buckets):
+        bounds[i] = bucket.bounds()
+    return bounds
+
+
+def inside_mask(positions, bounds):
+    """
+    Test every grain against every bucket in one pass.
+
+    :param positions: Array of shape (N, 2) with the grain positions.
+    :param bounds: Array of shape (M, 4) with the bucket bounds.
+    :return: Boolean array of shape (M, N), True where grain j is inside bucket i.
+    """
+    x = positions[:, 0]
+    y = positions[:, 1]
+    left, right, bottom, top = (bounds[:, i:i + 1] for i in range(4))
+    return (left <= x) & (x <= right) & (bottom <= y) & (y <= top)
+
+
+def count_grains(buckets, positions, played):
+    """
+    Count the grains in every un-exploded bucket. This gives the same result as
+    calling Bucket.collect() for every grain against every bucket, including
+    playing the bucket hit sound only once per grain.
+
+    :param buckets: List of Bucket objects. Counts are added to bucket.count.
+    :param positions: Array of shape (N, 2) with the grain positions.
+    :param played: Boolean array of the grains that already played the hit sound, updated in place.
+    :return: Array with the number of grains found in each bucket.
+    """
+    if not buckets or not len(positions):
+        return np.zeros(len(buckets), dtype=np.int64)
+
+    inside = inside_mask(positions, bucket_bounds(buckets))
+    # Exploded buckets don't collect anything
+    live = np.array([not bucket.exploded for bucket in buckets])
+    inside &= live[:, None]
+
+    counts = inside.sum(axis=1)
+    for bucket, count in zip(buckets, counts):
+        if not bucket.exploded:
+            bucket.count += int(count)
+
+    # Play the hit sound for grains that just landed in a bucket, from the
+    # first bucket that holds them (the same one collect() would have used)
+    landed = np.flatnonzero(inside.any(axis=0) & ~played)
+    for j in landed:
+        sound = buckets[int(inside[:, j].argmax())].sound
+        if sound:
+            sound.play_bucket_hit()
+    played[landed] = True
+    return counts
+
+
+class BucketSensors:
+    """
+    Keeps the bucket counts up to date from collision events on the bucket
+    sensors instead of testing every grain against every bucket: a grain
+    entering a sensor adds one to its bucket and leaving takes one away, so
+    the work is proportional to the grains that moved in or out.
+    """
+    def __init__(self, space):
+        """
+        Register the grain/sensor collision handler on a space.
+
+        :param space: The Pymunk space holding the grains and the buckets.
+        """
+        self.buckets = {}  # Sensor shape -> Bucket
+        self.played = set()  # Grain shapes that already played the bucket hit sound
+        space.on_collision(GRAIN_COLLISION_TYPE, BOX_COLLISION_TYPE, begin=self.begin, separate=self.separate)
+
+    def add(self, bucket):
+        """
+        Start counting the grains in a bucket created with sensor=True.
+        """
+        self.buckets[bucket.sensor] = bucket
+
+    def clear(self):
+        self.buckets = {}
+        self.played = set()
+
+    @staticmethod
+    def _shapes(arbiter):
+        """
+        The grain and the sensor of an arbiter. Separate callbacks fired by
+        removing a shape don't keep the handler's order, so check the types.
+        """
+        a, b = arbiter.shapes
+        return (a, b) if a.collision_type == GRAIN_COLLISION_TYPE else (b, a)
+
+    def begin(self, arbiter, space, data):
+        grain, sensor = self._shapes(arbiter)
+        bucket = self.buckets.get(sensor)
+        if bucket is None or bucket.exploded:
+            return
+        bucket.grains_inside += 1
+        bucket.update_count()
+        if grain not in self.played:
+            if bucket.sound:
+                bucket.sound.play_bucket_hit()
+            self.played.add(grain)
+
+    def separate(self, arbiter, space, data):
+        grain, sensor = self._shapes(arbiter)
+        bucket = self.buckets.get(sensor)
+        if bucket is None or bucket.exploded:
+            return
+        # Also called when a grain is removed while inside (deleted, frozen or recycled)
+        bucket.grains_inside -= 1
+        bucket.update_count()
@@ -0,0 +1,175 @@
+#############################################################
+# Module Name: Sugar Pop Dirty Rects Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Tracks which parts of the screen changed between frames
+#############################################################
+import math
+import numpy as np
+import pygame as pg
+from settings import DIRTY_TILE_SIZE
+
+# Odd multipliers that spread grain pixel positions over a 20 bit hash
+HASH_X = 73856093
+HASH_Y = 19349663
+
+
+class DirtyRects:
+    """
+    Splits the screen into tiles and works out which ones have to be redrawn
+    this frame: tiles whose grains moved, and the areas drawables covered
+    this frame or the last one. The dirty tiles are merged into a short
+    list of rectangles for pg.display.update().
+    """
+    def __init__(self, size, tile=DIRTY_TILE_SIZE):
+        """
+        Initialize the tracker.
+
+        :param size: Size of the screen in pixels.
+        :param tile: Size of a tile in pixels.
+        """
+        self.width, self.height = size
+        self.tile = tile
+        self.columns = math.ceil(self.width / tile)
+        self.rows = math.ceil(self.height / tile)
+        self.mask = np.zeros((self.rows, self.columns), dtype=bool)
+        self.signature = None  # Per-tile hash of the grains drawn last frame
+        self.last_rects = {}  # Drawable name -> rectangle it covered last frame
+        self.rects_now = {}
+
+    def mark(self, rect):
+        """
+        Mark every tile a rectangle touches as dirty.
+        """
+        if rect is None:
+            return
+        rect = pg.Rect(rect).clip((0, 0, self.width, self.height))
+        if not rect.width or not rect.height:
+            return
+        t = self.tile
+        self.mask[rect.top // t:(rect.bottom - 1) // t + 1, rect.left // t:(rect.right - 1) // t + 1] = True
+
+    def mark_all(self):
+        self.mask[:] = True
+
+    def collides(self, rect):
+        """
+        Check if a rectangle touches a dirty tile.
+        """
+        if rect is None:
+            return False
+        rect = pg.Rect(rect).clip((0, 0, self.width, self.height))
+        if not rect.width or not rect.height:
+            return False
+        t = self.tile
+        return bool(self.mask[rect.top // t:(rect.bottom - 1) // t + 1, rect.left // t:(rect.right - 1) // t + 1].any())
+
+    def grain_tiles(self, screen_pos, size):
+        """
+        Tile index of each corner of every grain.
+
+        :param screen_pos: (N, 2) array with the top-left pixel of each grain.
+        :param size: Size of a drawn grain in pixels.
+        :return: (4, N) array of flat tile indices.
+        """
+        x0 = np.clip(screen_pos[:, 0], 0, self.width - 1) // self.tile
+        y0 = np.clip(screen_pos[:, 1], 0, self.height - 1) // self.tile
+        x1 = np.clip(screen_pos[:, 0] + size - 1, 0, self.width - 1) // self.tile
+        y1 = np.clip(screen_pos[:, 1] + size - 1, 0, self.height - 1) // self.tile
+        return np.stack((y0 * self.columns + x0, y0 * self.columns + x1, y1 * self.columns + x0, y1 * self.columns + x1))
+
+    def mark_grains(self, screen_pos, size):
+        """
+        Mark the tiles whose grains are not where they were last frame: a grain
+        moved in, out or within the tile, or was added or removed.
+
+        :param screen_pos: (N, 2) array with the top-left pixel of each grain.
+        :param size: Size of a drawn grain in pixels.
+        """
+        tiles = self.grain_tiles(screen_pos, size).ravel()
+        x = screen_pos[:, 0].astype(np.int64)
+        y = screen_pos[:, 1].astype(np.int64)
+        grain_hash = np.tile(((x * HASH_X) ^ (y * HASH_Y)) & 0xFFFFF, 4)
+        count = self.rows * self.columns
+        # The number of grains and the sum of their hashes in every tile
+        signature = np.stack((np.bincount(tiles, minlength=count),
+                              np.bincount(tiles, weights=grain_hash, minlength=count).astype(np.int64)))
+        if self.signature is None:
+            self.mask[:] = True
+        else:
+            self.mask.ravel()[(signature != self.signature).any(axis=0)] = True
+        self.signature = signature
+
+    def touching(self, screen_pos, size):
+        """
+        Mask of the grains that touch a dirty tile, the only ones that need drawing.
+        A grain sitting across a dirty and a clean tile makes the clean one dirty
+        too, otherwise it would be drawn over whatever is on top of that tile.
+        """
+        tiles = self.grain_tiles(screen_pos, size)
+        flat = self.mask.ravel()
+        while True:
+            touching = flat[tiles].any(axis=0)
+            spill = tiles[:, touching]
+            if flat[spill].all():
+                return touching
+            flat[spill] = True
+
+    def track(self, name, rect, changed=True):
+        """
+        Follow a drawable from frame to frame and decide if it must be drawn.
+        A drawable that changed, moved or sits on a dirty tile gets its old
+        and new areas marked dirty.
+
+        :param name: Name of the drawable.
+        :param rect: Area it covers this frame, or None if it isn't drawn.
+        :param changed: False if it looks exactly like last frame.
+        :return: True if it has to be drawn this frame.
+        """
+        last = self.last_rects.get(name)
+        self.rects_now[name] = rect
+        if changed or rect != last or self.collides(rect):
+            self.mark(last)
+            self.mark(rect)
+            return rect is not None
+        return False
+
+    def rects(self):
+        """
+        Merge the dirty tiles into rectangles: runs of tiles along each row,
+        joined with the same run on the rows below.
+
+        :return: List of pg.Rect.
+        """
+        runs = {}  # (first column, last column) -> rectangle still growing downwards
+        rects = []
+        t = self.tile
+        for row in range(self.rows):
+            line = self.mask[row]
+            if not line.any():
+                rects += runs.values()
+                runs = {}
+                continue
+            # Start and end of every run of dirty tiles in this row
+            edges = np.flatnonzero(np.diff(np.concatenate(([False], line, [False])).astype(np.int8)))
+            grown = {}
+            for start, end in zip(edges[::2], edges[1::2]):
+                key = (int(start), int(end))
+                rect = runs.pop(key, None)
+                if rect is None:
+                    rect = pg.Rect(start * t, row * t, (end - start) * t, 0)
+                rect.height += t
+                grown[key] = rect
+            rects += runs.values()
+            runs = grown
+        rects += runs.values()
+        return [rect.clip((0, 0, self.width, self.height)) for rect in rects]
+
+    def end_frame(self):
+        """
+        Forget this frame's dirty tiles and remember where the drawables were.
+        """
+        self.last_rects = self.rects_now
+        self.rects_now = {}
+        self.mask[:] = False
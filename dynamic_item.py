@@ -5,12 +5,56 @@
 # By: Brett W. Huffman
 # Description: The dynamic item implementation of the sugar pop game
 #############################################################
+import math
 import pygame as pg
 import pymunk
-from settings import SCALE, HEIGHT, WIDTH
+from settings import SCALE, HEIGHT, WIDTH, LINE_SIMPLIFY_TOLERANCE, MAX_SEGMENTS_PER_LINE
+
+def point_line_distance(point, start, end):
+    """
+    Distance from a point to the line segment between start and end.
+    """
+    px, py = point
+    ax, ay = start
+    bx, by = end
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def simplify_polyline(points, tolerance):
+    """
+    Simplify a polyline with the Ramer-Douglas-Peucker algorithm.
+
+    :param points: List of (x, y) points.
+    :param tolerance: Largest distance a dropped point may be from the simplified line.
+    :return: The list of points that are kept, always including the first and last.
+    """
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        furthest, furthest_distance = None, tolerance
+        for i in range(first + 1, last):
+            distance = point_line_distance(points[i], points[first], points[last])
+            if distance > furthest_distance:
+                furthest, furthest_distance = i, distance
+        if furthest is not None:
+            keep[furthest] = True
+            stack.append((first, furthest))
+            stack.append((furthest, last))
+    return [point for point, k in zip(points, keep) if k]
+
 
 class DynamicItem:
-    def __init__(self, space, color='red', friction=0.3, elasticity=0.5, thickness=0.2):
+    def __init__(self, space, color='red', friction=0.3, elasticity=0.5, thickness=0.2,
+                 tolerance=LINE_SIMPLIFY_TOLERANCE, max_segments=MAX_SEGMENTS_PER_LINE):
         """
         Initialize the dynamic item.
 
@@ -18,21 +62,32 @@ class DynamicItem:
         :param color: The color for drawing the item.
         :param friction: The friction coefficient of the item's surfaces.
         :param elasticity: The elasticity (bounciness) of the item's surfaces.
+        :param tolerance: How far in pixels the line may stray from the mouse path
+                          to save a segment. 0 keeps every sampled point.
+        :param max_segments: Most collision segments this line may have, None for no limit.
         """
         self.color = color
         self.space = space
         self.friction = friction
         self.elasticity = elasticity
         self.thickness = thickness
+        self.tolerance = tolerance / SCALE
+        self.max_segments = max_segments
         self.vertices = []  # Store vertices as they are added
         self.segments = []  # Store the segments created
+        # Mouse points covered by the last segment, which keeps stretching while they stay close to it
+        self.pending = []
         # Create a static body to attach the segments to
         self.body = pymunk.Body(body_type=pymunk.Body.STATIC)
         self.space.add(self.body)
 
     def add_vertex(self, x, y):
         """
-        Add a new vertex and create a Segment between the last vertex and the new one.
+        Add a new mouse point to the line. While the points since the last corner
+        stay within the tolerance of one straight line, the last segment is
+        stretched to the new point instead of adding another segment.
+
+        :return: False if the point was dropped because the segment budget is used up.
         """
         # Convert the Pygame coordinates to Pymunk coordinates (Pymunk's Y-axis points upwards)
         adjusted_x = x / SCALE
@@ -40,18 +95,59 @@ class DynamicItem:
 
         # Add the new vertex with adjusted coordinates
         new_vertex = (adjusted_x, adjusted_y)
-        
-        if self.vertices:
-            # Create a segment between the last vertex and the new vertex
-            last_vertex = self.vertices[-1]
-            segment = pymunk.Segment(self.body, last_vertex, new_vertex, self.thickness)  # Thickness of 0.1 units
-            segment.friction = self.friction
-            segment.elasticity = self.elasticity
-            self.space.add(segment)
-            self.segments.append(segment)
-        
+
+        if not self.vertices:
+            self.vertices.append(new_vertex)
+            return True
+
+        if self.segments and self.tolerance > 0:
+            corner = self.vertices[-2]
+            if all(point_line_distance(point, corner, new_vertex) <= self.tolerance for point in self.pending):
+                # Still straight enough, stretch the last segment to the new point
+                segment = self.segments[-1]
+                segment.unsafe_set_endpoints(corner, new_vertex)
+                self.space.reindex_shape(segment)
+                self.vertices[-1] = new_vertex
+                self.pending.append(new_vertex)
+                return True
+
+        if self.max_segments is not None and len(self.segments) >= self.max_segments:
+            return False  # Out of segments for this line
+
+        # Create a segment between the last vertex and the new vertex
+        last_vertex = self.vertices[-1]
+        self.add_segment(last_vertex, new_vertex)
+        self.pending = [new_vertex]
+
         # Add the new vertex to the list
         self.vertices.append(new_vertex)
+        return True
+
+    def add_segment(self, start, end):
+        """
+        Create a collision segment between two vertices.
+        """
+        segment = pymunk.Segment(self.body, start, end, self.thickness)  # Thickness of 0.1 units
+        segment.friction = self.friction
+        segment.elasticity = self.elasticity
+        self.space.add(segment)
+        self.segments.append(segment)
+
+    def finish(self):
+        """
+        Called when the user lets go of the mouse. Runs one more simplification
+        pass over the whole line and rebuilds the segments if that saves any.
+        """
+        self.pending = []
+        if self.tolerance <= 0:
+            return
+        simplified = simplify_polyline(self.vertices, self.tolerance)
+        if len(simplified) < len(self.vertices):
+            self.space.remove(*self.segments)
+            self.segments = []
+            for start, end in zip(simplified, simplified[1:]):
+                self.add_segment(start, end)
+            self.vertices = simplified
 
     def set_color(self, color='blue'):
         """
@@ -64,6 +160,8 @@ class DynamicItem:
     def draw(self, screen):
         """
         Draw the chain shape (edges) on the Pygame screen.
+
+        :return: Number of draw calls made.
         """
         # Calculate the visual line width based on thickness
         line_width = max(1, int(self.thickness * SCALE * 0.7))
@@ -76,6 +174,21 @@ class DynamicItem:
             start = (start_x, start_y)
             end = (end_x, end_y)
             pg.draw.line(screen, pg.Color(self.color), start, end, line_width)
+        return max(0, len(self.vertices) - 1)
+
+    def rect(self):
+        """
+        Screen rectangle covered by the line as draw() draws it, or None if it has no vertices.
+        """
+        if not self.vertices:
+            return None
+        line_width = max(1, int(self.thickness * SCALE * 0.7))
+        xs = [x * SCALE for x, y in self.vertices]
+        ys = [HEIGHT - y * SCALE for x, y in self.vertices]
+        # Thick lines spread half their width past the end points, pad a little more for rounding
+        pad = line_width // 2 + 2
+        left, top = int(min(xs)) - pad, int(min(ys)) - pad
+        return pg.Rect(left, top, int(max(xs)) + pad - left + 1, int(max(ys)) + pad - top + 1)
 
     def delete(self):
         """
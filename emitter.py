@@ -0,0 +1,105 @@
+#############################################################
+# Module Name: Sugar Pop Emitter Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: The spout: pours grains at a flow rate, in batches
+#############################################################
+import math
+from settings import *
+from grain_pool import GRAIN_SIZE
+
+GRAIN_SPACING = GRAIN_SIZE * SCALE * 1.25  # Pixels between grains of one burst, so none overlap
+
+
+class Emitter:
+    def __init__(self, x, y, flow_rate=SPOUT_FLOW_RATE, burst=SPOUT_BURST, jitter=SPOUT_JITTER,
+                 speed=SPOUT_SPEED, rng=None):
+        """
+        Initialize a spout.
+
+        :param x: X position of the spout in pixels (Pymunk orientation, y up).
+        :param y: Y position of the spout in pixels.
+        :param flow_rate: Grains per second of simulated time.
+        :param burst: Fewest grains created together in one batch. Bursts get
+                      bigger when the flow rate is more than one burst per clear_time().
+        :param jitter: Pixels each grain may be moved from its place in the burst.
+        :param speed: Downward speed (meters/second) the grains leave the spout with.
+        :param rng: random.Random used for the jitter, so seeded runs repeat.
+        """
+        self.x = x
+        self.y = y
+        self.flow_rate = flow_rate
+        self.burst = max(1, int(burst))
+        self.speed = speed
+        self.rng = rng
+        # Never move a grain far enough to touch its neighbour
+        self.jitter = min(jitter, (GRAIN_SPACING - GRAIN_SIZE * SCALE) / 2 * 0.9)
+        self.owed = 0.0  # Grains the flow rate has asked for but that were not made yet
+        self.wait = 0.0  # Seconds until the last burst has cleared the spout
+
+    @classmethod
+    def from_level(cls, data, rng=None):
+        """
+        Build the spout of a level. Besides spout_x and spout_y, a level may set
+        spout_rate (grains per second), spout_burst, spout_jitter (pixels) and
+        spout_speed (meters/second); anything missing comes from the settings.
+        """
+        return cls(data['spout_x'], data['spout_y'],
+                   data.get('spout_rate', SPOUT_FLOW_RATE), data.get('spout_burst', SPOUT_BURST),
+                   data.get('spout_jitter', SPOUT_JITTER), data.get('spout_speed', SPOUT_SPEED), rng)
+
+    @staticmethod
+    def columns(count):
+        """
+        Width of the grid a burst of count grains is laid out in, about square.
+        """
+        return max(1, math.ceil(math.sqrt(count)))
+
+    def clear_time(self, count):
+        """
+        Seconds a burst of count grains needs to fall its own height out of the way of the next one.
+        """
+        height = math.ceil(count / self.columns(count)) * GRAIN_SPACING / SCALE
+        # Starting at speed and speeding up with gravity: height = speed t + GRAVITY t^2 / 2
+        return (math.sqrt(self.speed ** 2 + 2 * GRAVITY * height) - self.speed) / GRAVITY
+
+    def update(self, dt, remaining):
+        """
+        Advance the flow by one physics step.
+
+        :param dt: Simulated seconds in the step.
+        :param remaining: Grains the level still has to pour.
+        :return: Number of grains to make now (0 most steps).
+        """
+        # Grains owed pile up while the last burst clears, up to a second's worth
+        self.owed = min(self.owed + self.flow_rate * dt, max(self.burst, self.flow_rate))
+        self.wait -= dt
+        count = min(int(self.owed), remaining)
+        # Wait for a full burst unless the level is nearly out of sugar
+        if count < min(self.burst, remaining) or self.wait > 0:
+            return 0
+        self.owed -= count
+        self.wait = self.clear_time(count)
+        return count
+
+    def points(self, count, wander=0.0):
+        """
+        Where the grains of one burst start: a grid growing down from the spout,
+        each grain jittered a little so the pile doesn't form a perfect lattice.
+
+        :param count: Number of grains.
+        :param wander: Pixels the whole burst is shifted sideways.
+        :return: List of (x, y) positions in pixels.
+        """
+        columns = self.columns(count)
+        left = self.x + wander - (columns - 1) * GRAIN_SPACING / 2
+        points = []
+        for i in range(count):
+            x = left + (i % columns) * GRAIN_SPACING
+            y = self.y - (i // columns) * GRAIN_SPACING
+            if count > 1 and self.jitter > 0 and self.rng:
+                x += self.rng.uniform(-self.jitter, self.jitter)
+                y += self.rng.uniform(-self.jitter, self.jitter)
+            points.append((x, y))
+        return points
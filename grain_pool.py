@@ -0,0 +1,230 @@
+#############################################################
+# Module Name: Sugar Pop Grain Pool Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Array backed storage for all the sugar grains of a level
+#############################################################
+from itertools import chain
+import numpy as np
+import pymunk
+from settings import SCALE, GRAIN_CATEGORY, GRAIN_COLLISION_TYPE, GRAIN_SHAPE
+
+GRAIN_MASS = 1.0
+GRAIN_SIZE = 2 / SCALE  # Size of the square in physics units
+GRAIN_FILTER = pymunk.ShapeFilter(categories=GRAIN_CATEGORY)
+# Narrows space queries to the grains, but shapes left in the default all-bits category
+# (walls, statics) match it too, so check the collision type of what comes back
+GRAIN_QUERY_FILTER = pymunk.ShapeFilter(mask=GRAIN_CATEGORY)
+# 'box' rotating squares, 'circle' circles that never turn, 'particle' the NumPy solver in particle_pool.py
+GRAIN_SHAPES = ('box', 'circle', 'particle')
+
+
+class GrainPool:
+    """
+    Holds every sugar grain of the level as a struct of arrays: one array of
+    positions, one played mask and the lists of Pymunk bodies and shapes,
+    instead of one sugar_grain object per grain.
+
+    Deleted grains keep their body and shape on a free list, and spawn()
+    reuses those before allocating new ones.
+
+    The Pymunk body and shape of every grain are still most of its memory,
+    so the pool makes the whole-level work fast but barely shrinks a grain;
+    see ParticlePool for grains without them.
+    """
+    def __init__(self, space, friction=0.3, elasticity=0.5, capacity=256, shape=GRAIN_SHAPE):
+        """
+        Initialize an empty grain pool.
+
+        :param space: The Pymunk space where the grains will be created.
+        :param friction: Friction of every grain.
+        :param elasticity: Elasticity (bounciness) of every grain.
+        :param capacity: Number of grains to reserve room for in the arrays.
+        :param shape: 'box' for square grains, 'circle' for round ones. Circles
+                      collide more cheaply and are given no rotation at all.
+        """
+        if shape not in ('box', 'circle'):
+            raise ValueError(f"Unknown grain shape: {shape}")
+        self.space = space
+        self.shape = shape
+        self.friction = friction
+        self.elasticity = elasticity
+        self.bodies = []
+        self.shapes = []
+        self.free = []  # (body, shape) pairs of deleted grains, out of the space and ready for reuse
+        self.allocated = 0  # Bodies ever created by this pool
+        self.recycled = 0  # Grains spawned from the free list
+        self._positions = np.zeros((capacity, 2), dtype=np.float64)
+        self._previous = np.zeros((capacity, 2), dtype=np.float64)
+        self._played = np.zeros(capacity, dtype=bool)
+
+        # Every grain has the same shape so work it out once
+        s = GRAIN_SIZE / 2
+        self.vertices = [(-s, -s), (-s, s), (s, s), (s, -s)]
+        # An infinite moment keeps circles from rolling, they have nothing to show for it
+        self.moment = pymunk.moment_for_box(GRAIN_MASS, (GRAIN_SIZE, GRAIN_SIZE)) if shape == 'box' else float('inf')
+
+    def __len__(self):
+        return len(self.bodies)
+
+    @property
+    def positions(self):
+        """
+        Pymunk positions of the grains as an (N, 2) array, as of the last sync().
+        """
+        return self._positions[:len(self)]
+
+    def interpolated(self, alpha):
+        """
+        Positions blended between the previous and the current physics step.
+
+        :param alpha: 0 gives the previous step, 1 the current one.
+        """
+        count = len(self)
+        previous = self._previous[:count]
+        return previous + (self._positions[:count] - previous) * alpha
+
+    @property
+    def played(self):
+        """
+        Mask of the grains that already played the bucket hit sound.
+        """
+        return self._played[:len(self)]
+
+    def _reserve(self, size):
+        """
+        Grow the arrays so they can hold at least size grains.
+        """
+        capacity = len(self._played)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        self._positions = self._grow(self._positions, capacity)
+        self._previous = self._grow(self._previous, capacity)
+        self._played = self._grow(self._played, capacity)
+
+    def _grow(self, array, capacity):
+        """
+        Copy the live part of an array into a new one with room for capacity grains.
+        """
+        grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(self)] = array[:len(self)]
+        return grown
+
+    def spawn(self, points, velocity=(0, 0)):
+        """
+        Create many grains at once and add them to the space in a single call.
+
+        :param points: Sequence of (x, y) positions in Pygame coordinates.
+        :param velocity: Starting velocity of every new grain.
+        :return: Index of the first new grain.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2) / SCALE
+        start = len(self.bodies)
+        self._reserve(start + len(points))
+
+        new_items = []
+        for x, y in points.tolist():
+            if self.free:
+                # Reuse a deleted grain, it only needs its motion cleared
+                body, shape = self.free.pop()
+                body.angular_velocity = 0
+                body.angle = 0
+                self.recycled += 1
+            else:
+                body = pymunk.Body(GRAIN_MASS, self.moment)
+                shape = pymunk.Poly(body, self.vertices) if self.shape == 'box' else pymunk.Circle(body, GRAIN_SIZE / 2)
+                shape.friction = self.friction
+                shape.elasticity = self.elasticity
+                shape.filter = GRAIN_FILTER
+                shape.collision_type = GRAIN_COLLISION_TYPE
+                self.allocated += 1
+            body.position = x, y
+            body.velocity = velocity
+            self.bodies.append(body)
+            self.shapes.append(shape)
+            new_items += (body, shape)
+        self.space.add(*new_items)
+
+        self._positions[start:len(self.bodies)] = points
+        self._previous[start:len(self.bodies)] = points
+        self._played[start:len(self.bodies)] = False
+        return start
+
+    def save_previous(self):
+        """
+        Keep the current positions as the previous step, before the space is stepped.
+        """
+        count = len(self)
+        self._previous[:count] = self._positions[:count]
+
+    def sync(self):
+        """
+        Copy the body positions from Pymunk into the positions array.
+        Call once per physics step before reading positions.
+        """
+        count = len(self.bodies)
+        if count:
+            flat = np.fromiter(chain.from_iterable(body.position for body in self.bodies), dtype=np.float64, count=count * 2)
+            self._positions[:count] = flat.reshape(count, 2)
+
+    def delete(self, indices):
+        """
+        Remove many grains at once from the space and the pool. Their bodies
+        and shapes go on the free list.
+
+        :param indices: Indices of the grains to remove, or a boolean mask.
+        :return: Number of grains removed.
+        """
+        remove = np.zeros(len(self.bodies), dtype=bool)
+        remove[indices] = True
+        if not remove.any():
+            return 0
+        removed = [(self.bodies[i], self.shapes[i]) for i in np.flatnonzero(remove)]
+        self.space.remove(*chain.from_iterable(removed))
+        self.free += removed
+
+        keep = ~remove
+        kept = int(keep.sum())
+        self.bodies = [body for body, k in zip(self.bodies, keep) if k]
+        self.shapes = [shape for shape, k in zip(self.shapes, keep) if k]
+        self._positions[:kept] = self._positions[:len(keep)][keep]
+        self._previous[:kept] = self._previous[:len(keep)][keep]
+        self._played[:kept] = self._played[:len(keep)][keep]
+        return len(removed)
+
+    def outside(self, left, bottom, right, top):
+        """
+        Mask of the grains outside a rectangle.
+
+        :param left, bottom, right, top: Edges of the rectangle in Pymunk units.
+        """
+        positions = self.positions
+        x = positions[:, 0]
+        y = positions[:, 1]
+        return (x < left) | (x > right) | (y < bottom) | (y > top)
+
+    def asleep(self, indices):
+        """
+        Check if all the given grains are asleep.
+        """
+        return all(self.bodies[i].is_sleeping for i in indices)
+
+    def wake(self):
+        """
+        Wake every sleeping grain, e.g. when gravity changes.
+        """
+        for body in self.bodies:
+            body.activate()
+
+    def clear(self):
+        """
+        Remove every grain from the space, keeping them on the free list for the next level.
+        """
+        if self.bodies:
+            self.space.remove(*self.bodies, *self.shapes)
+            self.free += zip(self.bodies, self.shapes)
+        self.bodies = []
+        self.shapes = []
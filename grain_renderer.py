@@ -0,0 +1,110 @@
+#############################################################
+# Module Name: Sugar Pop Grain Renderer Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Batched drawing of all the sugar grains at once
+#############################################################
+import numpy as np
+import pygame as pg
+from settings import SCALE, HEIGHT, GRAIN_RENDER_MODE
+
+GRAIN_SIZE = 4  # Size of a drawn grain in pixels
+GRAIN_COLOR = 'white'
+RENDER_MODES = ('blits', 'pixels', 'per_object')
+
+
+class GrainRenderer:
+    def __init__(self, mode=GRAIN_RENDER_MODE):
+        """
+        Initialize the grain renderer.
+
+        :param mode: 'blits' blits a cached grain sprite with Surface.blits,
+                     'pixels' writes the grains straight into the screen pixels,
+                     'per_object' calls draw() on every grain (the old path).
+        """
+        if mode not in RENDER_MODES:
+            raise ValueError(f"Unknown grain render mode: {mode}")
+        self.mode = mode
+        self.color = pg.Color(GRAIN_COLOR)
+        self.sprite = pg.Surface((GRAIN_SIZE, GRAIN_SIZE))
+        self.sprite.fill(self.color)
+        # Pixel offsets covered by one grain, used by the 'pixels' mode
+        offsets = np.arange(GRAIN_SIZE)
+        self.offset_x = np.repeat(offsets, GRAIN_SIZE)
+        self.offset_y = np.tile(offsets, GRAIN_SIZE)
+
+    @staticmethod
+    def to_screen(positions):
+        """
+        Convert an (N, 2) array of Pymunk positions to the top-left pixel of each grain.
+        """
+        screen_pos = np.empty(positions.shape, dtype=np.int32)
+        screen_pos[:, 0] = positions[:, 0] * SCALE - 1
+        screen_pos[:, 1] = HEIGHT - positions[:, 1] * SCALE - 1
+        return screen_pos
+
+    def screen_positions(self, grains, alpha=1.0):
+        """
+        Top-left pixel of every grain as it will be drawn.
+
+        :param grains: The GrainPool holding the sugar grains.
+        :param alpha: How far between the previous and current physics step to draw the grains.
+        """
+        positions = grains.positions if alpha >= 1.0 else grains.interpolated(alpha)
+        return self.to_screen(positions)
+
+    def draw(self, screen, grains, alpha=1.0, screen_pos=None):
+        """
+        Draw all the sugar grains on the screen.
+
+        :param screen: The Pygame surface to draw on.
+        :param grains: The GrainPool holding the sugar grains.
+        :param alpha: How far between the previous and current physics step to draw the grains.
+        :param screen_pos: Pixels to draw grains at instead of the whole pool, e.g. only
+                           the grains in the dirty part of the screen. Ignored by 'per_object'.
+        :return: Number of draw calls made.
+        """
+        if not len(grains):
+            return 0
+        if self.mode == 'per_object':
+            self.draw_each(screen, grains)
+            return len(grains)
+
+        if screen_pos is None:
+            screen_pos = self.screen_positions(grains, alpha)
+        if not len(screen_pos):
+            return 0
+        if self.mode == 'blits':
+            sprite = self.sprite
+            screen.blits([(sprite, pos) for pos in screen_pos.tolist()], False)
+        else:
+            self.draw_pixels(screen, screen_pos)
+        return 1
+
+    def draw_each(self, screen, grains):
+        """
+        Draw the grains one at a time, reading each body position (the original path).
+        Particle grains have no bodies, so their positions come from the pool's array.
+        """
+        if grains.bodies:
+            positions = ((body.position.x, body.position.y) for body in grains.bodies)
+        else:
+            positions = grains.positions.tolist()
+        for x, y in positions:
+            screen_x = x * SCALE
+            screen_y = HEIGHT - y * SCALE
+            pg.draw.rect(screen, pg.Color(GRAIN_COLOR), (screen_x - 1, screen_y - 1, GRAIN_SIZE, GRAIN_SIZE))
+
+    def draw_pixels(self, screen, screen_pos):
+        """
+        Write the grains directly into the screen pixel array.
+        """
+        width, height = screen.get_size()
+        xs = (screen_pos[:, 0:1] + self.offset_x).ravel()
+        ys = (screen_pos[:, 1:2] + self.offset_y).ravel()
+        # Drop the pixels that are off the screen
+        on_screen = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        pixels = pg.surfarray.pixels2d(screen)
+        pixels[xs[on_screen], ys[on_screen]] = screen.map_rgb(self.color)
+        del pixels  # Unlock the screen surface
@@ -7,27 +7,224 @@
 #############################################################
 
 import json
+import math
 import os
+from settings import WIDTH, HEIGHT, SCALE
+
+# Material of a static line when the level doesn't give one
+STATIC_DEFAULTS = {"color": "gray", "line_width": 3, "friction": 0.3, "restitution": 0.5}
+MIN_STATIC_LENGTH = 1.0  # Pixels, shorter statics are refused
+MERGE_TOLERANCE = 0.5  # Pixels two statics may be apart and still count as one line
+SPOUT_OPTIONS = ("spout_rate", "spout_burst", "spout_jitter", "spout_speed")
+
+
+def static_bbox(static):
+    """
+    Bounding box of a static line including its width, in Pygame pixels (y up, like the level file).
+
+    :return: List of left, bottom, right, top.
+    """
+    pad = static["line_width"] / 2
+    return [min(static["x1"], static["x2"]) - pad, min(static["y1"], static["y2"]) - pad,
+            max(static["x1"], static["x2"]) + pad, max(static["y1"], static["y2"]) + pad]
+
+
+def bucket_aabb(bucket):
+    """
+    Bounds of a bucket in Pymunk units, the same numbers Bucket.bounds() gives.
+
+    :return: List of left, right, bottom, top.
+    """
+    x, y = bucket["x"] / SCALE, bucket["y"] / SCALE
+    width, height = bucket["width"] / SCALE, bucket["height"] / SCALE
+    return [x - width / 2, x + width / 2, y - height / 2, y + height / 2]
+
+
+def merge_statics(statics):
+    """
+    Join statics of the same material that lie on one line and overlap or touch.
+    Fewer, longer segments are cheaper for the solver and have no seams for
+    grains to catch on.
+
+    :param statics: List of valid static dictionaries with every key filled in.
+    :return: The merged list.
+    """
+    statics = [dict(static) for static in statics]
+    merged = True
+    while merged:
+        merged = False
+        for i, a in enumerate(statics):
+            for j in range(i + 1, len(statics)):
+                joined = join_statics(a, statics[j])
+                if joined:
+                    statics[i] = joined
+                    del statics[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return statics
+
+
+def join_statics(a, b):
+    """
+    One static covering both a and b, or None if they are not on the same line,
+    don't touch or are made of different materials.
+    """
+    if any(a[key] != b[key] for key in STATIC_DEFAULTS):
+        return None
+    dx, dy = a["x2"] - a["x1"], a["y2"] - a["y1"]
+    length = math.hypot(dx, dy)
+    ux, uy = dx / length, dy / length
+    # Both ends of b must be on a's line
+    for x, y in ((b["x1"], b["y1"]), (b["x2"], b["y2"])):
+        if abs((x - a["x1"]) * uy - (y - a["y1"]) * ux) > MERGE_TOLERANCE:
+            return None
+    # Where b's ends fall along a, which runs from 0 to length
+    t1 = (b["x1"] - a["x1"]) * ux + (b["y1"] - a["y1"]) * uy
+    t2 = (b["x2"] - a["x1"]) * ux + (b["y2"] - a["y1"]) * uy
+    if max(t1, t2) < -MERGE_TOLERANCE or min(t1, t2) > length + MERGE_TOLERANCE:
+        return None
+    # Keep the end points themselves rather than points worked out from the direction
+    ends = sorted([(0.0, a["x1"], a["y1"]), (length, a["x2"], a["y2"]), (t1, b["x1"], b["y1"]), (t2, b["x2"], b["y2"])])
+    joined = dict(a)
+    joined.update(x1=ends[0][1], y1=ends[0][2], x2=ends[-1][1], y2=ends[-1][2])
+    return joined
+
+
+def validate(data):
+    """
+    Check level data against the level schema.
+
+    :param data: The level dictionary.
+    :return: List of problems, empty if the level is fine.
+    """
+    problems = []
+
+    def number(where, value, low=None, integer=False):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or (integer and not isinstance(value, int)):
+            problems.append(f"{where} must be {'a whole number' if integer else 'a number'}, not {value!r}")
+            return False
+        if low is not None and not value >= low:
+            problems.append(f"{where} must be at least {low}, not {value}")
+            return False
+        return True
+
+    for key in ("number_sugar_grains", "spout_x", "spout_y", "buckets", "statics"):
+        if key not in data:
+            problems.append(f"missing '{key}'")
+    if problems:
+        return problems
+
+    number("number_sugar_grains", data["number_sugar_grains"], 1, integer=True)
+    if number("spout_x", data["spout_x"]) and not 0 <= data["spout_x"] <= WIDTH:
+        problems.append(f"spout_x {data['spout_x']} is off the screen")
+    if number("spout_y", data["spout_y"]) and not 0 <= data["spout_y"] <= HEIGHT:
+        problems.append(f"spout_y {data['spout_y']} is off the screen")
+    for key in SPOUT_OPTIONS + ("time_to_complete_level",):
+        if key in data:
+            number(key, data[key], 0)
+    if data.get("broadphase", "tree") not in ("tree", "hash"):
+        problems.append(f"broadphase must be 'tree' or 'hash', not {data['broadphase']!r}")
+
+    if not isinstance(data["buckets"], list) or not data["buckets"]:
+        problems.append("a level needs at least one bucket")
+    else:
+        needed = 0
+        for i, bucket in enumerate(data["buckets"]):
+            where = f"bucket {i + 1}"
+            missing = [key for key in ("x", "y", "width", "height", "needed_sugar") if key not in bucket]
+            if missing:
+                problems.append(f"{where} is missing {', '.join(missing)}")
+                continue
+            fine = number(f"{where} x", bucket["x"]) & number(f"{where} y", bucket["y"]) \
+                & number(f"{where} width", bucket["width"], 1) & number(f"{where} height", bucket["height"], 1)
+            if number(f"{where} needed_sugar", bucket["needed_sugar"], 1, integer=True):
+                needed += bucket["needed_sugar"]
+            if fine:
+                left, right, bottom, top = (value * SCALE for value in bucket_aabb(bucket))
+                if left < 0 or right > WIDTH or bottom < 0 or top > HEIGHT:
+                    problems.append(f"{where} is not all on the screen")
+                for j, other in enumerate(data["buckets"][:i]):
+                    if all(key in other for key in ("x", "y", "width", "height")):
+                        o_left, o_right, o_bottom, o_top = (value * SCALE for value in bucket_aabb(other))
+                        if left < o_right and o_left < right and bottom < o_top and o_bottom < top:
+                            problems.append(f"{where} overlaps bucket {j + 1}")
+        if isinstance(data["number_sugar_grains"], int) and needed > data["number_sugar_grains"]:
+            problems.append(f"the buckets need {needed} grains but the level only pours {data['number_sugar_grains']}")
+
+    if not isinstance(data["statics"], list):
+        problems.append("statics must be a list")
+    else:
+        for i, static in enumerate(data["statics"]):
+            where = f"static {i + 1}"
+            missing = [key for key in ("x1", "y1", "x2", "y2") if key not in static]
+            if missing:
+                problems.append(f"{where} is missing {', '.join(missing)}")
+                continue
+            fine = all([number(f"{where} {key}", static[key]) for key in ("x1", "y1", "x2", "y2")])
+            if fine:
+                if not all(0 <= static[key] <= WIDTH for key in ("x1", "x2")) \
+                        or not all(0 <= static[key] <= HEIGHT for key in ("y1", "y2")):
+                    problems.append(f"{where} is not all on the screen")
+                length = math.hypot(static["x2"] - static["x1"], static["y2"] - static["y1"])
+                if length < MIN_STATIC_LENGTH:
+                    problems.append(f"{where} is {length:.1f} pixels long, shorter than {MIN_STATIC_LENGTH}")
+            if not isinstance(static.get("color", "gray"), str):
+                problems.append(f"{where} color must be a color name")
+            number(f"{where} line_width", static.get("line_width", 1), 1)
+            number(f"{where} friction", static.get("friction", 0), 0)
+            number(f"{where} restitution", static.get("restitution", 0), 0)
+    return problems
+
+
+def prepare(data):
+    """
+    Get level data ready for the game: validate it, fill in the static
+    defaults, merge the statics and work out each bucket's box, so the
+    load path has nothing left to compute or check. Running it again on
+    prepared data changes nothing.
+
+    :param data: The level dictionary, changed in place.
+    :return: List of problems. The data is only prepared if there are none.
+    """
+    problems = validate(data)
+    if problems:
+        return problems
+    statics = [dict(STATIC_DEFAULTS, **static) for static in data["statics"]]
+    for static in statics:
+        static.pop("bbox", None)  # Written by older versions, nothing reads it
+    data["statics"] = merge_statics(statics)
+    for bucket in data["buckets"]:
+        bucket["aabb"] = bucket_aabb(bucket)
+    return []
+
 
 class Level:
-    def __init__(self, level_file=None):
+    def __init__(self, level_file=None, data=None):
         """
         Initialize a Level object.
         
         :param level_file: Path to the JSON file for the level. If None, an empty level is created.
+        :param data: Already parsed level data (e.g. from the level cache), used instead of reading the file.
         """
         self.level_file = level_file
+        if data is not None:
+            self.data = data
+            return
         self.data = {
-            "number_sugar_grains": 0,
-            "static_boxes": [],
+            "number_sugar_grains": 100,
+            "statics": [],
             "buckets": [],
             "dynamic_objects": [],
+            "spout_x": WIDTH // 2,
+            "spout_y": HEIGHT - 50,
             "time_to_complete_level": 0,
         }
         
         if level_file and os.path.exists(level_file):
             self.load_level(level_file)
-        else:
+        elif level_file:
             print(f"Level file not found: {level_file}")
             self.data = {}
 
@@ -45,36 +242,54 @@ class Level:
 
     def save_level(self, level_file=None):
         """
-        Save the current level to a JSON file.
+        Save the current level to a JSON file, prepared for the game (see prepare()).
         
         :param level_file: Path to save the level. If None, uses the current level_file.
+        :raises ValueError: If there is no file to save to or the level is not valid.
+        :raises OSError: If the file could not be written.
         """
         if level_file:
             self.level_file = level_file
 
         if not self.level_file:
             raise ValueError("No file specified to save the level.")
+        problems = prepare(self.data)
+        if problems:
+            raise ValueError("Invalid level: " + "; ".join(problems))
 
-        try:
-            with open(self.level_file, 'w') as f:
-                json.dump(self.data, f, indent=4)
-        except Exception as e:
-            print(f"Error saving level: {e}")
+        with open(self.level_file, 'w') as f:
+            json.dump(self.data, f, indent=4)
 
-    def add_static_box(self, x, y, width, height):
+    def add_static(self, x1, y1, x2, y2, color="gray", line_width=3, friction=0.3, restitution=0.5):
         """
-        Add a static box to the level.
+        Add a static line to the level, in Pygame pixels with y pointing up like the rest of the file.
         """
-        self.data["static_boxes"].append({
-            "x": x,
-            "y": y,
-            "width": width,
-            "height": height
+        self.data["statics"].append({
+            "x1": x1,
+            "y1": y1,
+            "x2": x2,
+            "y2": y2,
+            "color": color,
+            "line_width": line_width,
+            "friction": friction,
+            "restitution": restitution
         })
 
- 
+    def add_static_box(self, x, y, width, height, **material):
+        """
+        Add a static box to the level as its four sides.
+
+        :param x, y: Center of the box.
+        :param material: color, line_width, friction and restitution, see add_static().
+        """
+        left, right = x - width / 2, x + width / 2
+        bottom, top = y - height / 2, y + height / 2
+        self.add_static(left, bottom, right, bottom, **material)
+        self.add_static(right, bottom, right, top, **material)
+        self.add_static(right, top, left, top, **material)
+        self.add_static(left, top, left, bottom, **material)
 
-    def add_bucket(self, x, y, width, height, number_sugar_grains):
+    def add_bucket(self, x, y, width, height, needed_sugar):
         """
         Add a bucket to the level.
         """
@@ -86,6 +301,13 @@ class Level:
             "needed_sugar": needed_sugar
         })
 
+    def set_spout(self, x, y):
+        """
+        Move the spout the sugar pours from.
+        """
+        self.data["spout_x"] = x
+        self.data["spout_y"] = y
+
     def set_number_sugar_grains(self, count):
         """
         Set the total number of sugar grains for the level.
@@ -97,4 +319,3 @@ class Level:
         Set the time to complete the level.
         """
         self.data["time_to_complete_level"] = time_in_seconds
-
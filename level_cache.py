@@ -0,0 +1,182 @@
+#############################################################
+# Module Name: Sugar Pop Level Cache Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Compiled level files, an LRU cache of parsed levels and preloading
+#############################################################
+import glob
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from settings import LEVEL_FILE_NAME, LEVEL_CACHE_SIZE
+import level
+
+COMPILED_MAGIC = b'SPLV'
+COMPILED_VERSION = 3  # 2: levels are validated and prepared (merged statics, bucket boxes), 3: no static bboxes
+
+
+def compiled_path(level_file):
+    """
+    Where the compiled form of a JSON level file is kept.
+    """
+    name = os.path.splitext(os.path.basename(level_file))[0]
+    return os.path.join(os.path.dirname(level_file), '__levelcache__', name + '.lvl')
+
+
+def compile_level(level_file):
+    """
+    Parse a JSON level file, prepare it for the game (see level.prepare()) and
+    write it out in the compiled format: a magic header, the SHA-256 of the
+    JSON source, and the pickled level data.
+
+    :param level_file: Path to the JSON file for the level.
+    :return: The prepared level data, or None if the file could not be read or is not a valid level.
+    """
+    try:
+        with open(level_file, 'rb') as f:
+            source = f.read()
+        data = json.loads(source)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error loading level: {e}")
+        return None
+    problems = level.prepare(data)
+    if problems:
+        print(f"Invalid level {level_file}: " + "; ".join(problems))
+        return None
+
+    target = compiled_path(level_file)
+    temp = None
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Written under a temporary name and swapped in whole, so another process
+        # or a preload thread never reads a half written file
+        handle, temp = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(COMPILED_MAGIC + bytes([COMPILED_VERSION]) + hashlib.sha256(source).digest())
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, target)
+    except OSError as e:
+        print(f"Could not write compiled level {target}: {e}")
+        if temp and os.path.exists(temp):
+            os.remove(temp)
+    return data
+
+
+def load_compiled(level_file):
+    """
+    Load a level from its compiled form, recompiling it if the JSON source changed.
+
+    :param level_file: Path to the JSON file for the level.
+    :return: The parsed level data, or None if the level does not exist.
+    """
+    if not os.path.exists(level_file):
+        return None
+    try:
+        with open(level_file, 'rb') as f:
+            source_hash = hashlib.sha256(f.read()).digest()
+        with open(compiled_path(level_file), 'rb') as f:
+            header = f.read(len(COMPILED_MAGIC) + 1 + len(source_hash))
+            if header == COMPILED_MAGIC + bytes([COMPILED_VERSION]) + source_hash:
+                return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    # Missing, stale or damaged: build it again from the JSON
+    return compile_level(level_file)
+
+
+class LevelCache:
+    def __init__(self, size=LEVEL_CACHE_SIZE):
+        """
+        Initialize an LRU cache of parsed levels.
+
+        :param size: Number of levels to keep in memory.
+        """
+        self.size = size
+        self.levels = OrderedDict()
+        self.loading = {}  # Level file -> thread preloading it
+        self.lock = threading.Lock()
+
+    def get(self, level_file):
+        """
+        Get a level, from memory if possible.
+
+        :param level_file: Path to the JSON file for the level.
+        :return: A Level object. Its data is empty if the level was not found.
+        """
+        with self.lock:
+            thread = self.loading.get(level_file)
+        if thread is not None:
+            thread.join()  # Already being loaded in the background, wait for it
+
+        with self.lock:
+            data = self.levels.get(level_file)
+            if data is not None:
+                self.levels.move_to_end(level_file)
+        if data is None:
+            data = self._load(level_file)
+        if data is None:
+            if not os.path.exists(level_file):
+                print(f"Level file not found: {level_file}")  # Invalid levels were reported when compiled
+            return level.Level(level_file, {})
+        return level.Level(level_file, data)
+
+    def forget(self, level_file):
+        """
+        Drop a level from memory, e.g. after the editor saved a new version of it.
+        """
+        with self.lock:
+            self.levels.pop(level_file, None)
+
+    def preload(self, level_file):
+        """
+        Start loading a level on a background thread so get() finds it ready.
+
+        :param level_file: Path to the JSON file for the level.
+        """
+        with self.lock:
+            if level_file in self.levels or level_file in self.loading:
+                return
+            thread = threading.Thread(target=self._load, args=(level_file,), daemon=True)
+            self.loading[level_file] = thread
+        thread.start()
+
+    def _load(self, level_file):
+        """
+        Read a compiled level into the cache, dropping the least recently used level if full.
+        """
+        try:
+            data = load_compiled(level_file)
+            if data is not None:
+                with self.lock:
+                    self.levels[level_file] = data
+                    self.levels.move_to_end(level_file)
+                    while len(self.levels) > self.size:
+                        self.levels.popitem(last=False)
+            return data
+        finally:
+            with self.lock:
+                self.loading.pop(level_file, None)
+
+
+# The levels shared by the whole game
+levels = LevelCache()
+
+
+def main():
+    """
+    Compile every level file given on the command line, or all of them.
+    """
+    files = sys.argv[1:] or sorted(glob.glob(LEVEL_FILE_NAME.replace("X", "*")))
+    for level_file in files:
+        if compile_level(level_file) is not None:
+            print(f"{level_file} -> {compiled_path(level_file)}")
+
+
+if __name__ == '__main__':
+    main()
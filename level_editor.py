@@ -0,0 +1,220 @@
+#############################################################
+# Module Name: Sugar Pop Level Editor Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: In-game editor that builds level files through the Level class
+#############################################################
+import math
+import os
+import pygame as pg
+from settings import *
+import level
+import level_cache
+
+TOOL_KEYS = {pg.K_1: 'static', pg.K_2: 'bucket', pg.K_3: 'spout'}
+PICK_DISTANCE = 6  # Pixels from an item a right click still removes it
+HELP = "1 line  2 bucket  3 spout  right click remove  Z undo  up/down grains  +/- bucket sugar  S save  Enter play"
+
+
+class LevelEditor:
+    """
+    Edit a level with the mouse: drag to draw a static line or a bucket, click
+    to move the spout. Points snap to an EDITOR_GRID pixel grid, so lines
+    drawn end to end line up and get merged when the level is saved. Saving
+    goes through Level.save_level(), which refuses levels that don't pass
+    validation and shows why.
+    """
+    def __init__(self, level_file, font):
+        """
+        Open a level for editing, or start a new one if the file doesn't exist.
+
+        :param level_file: Path to the JSON file to edit.
+        :param font: Font for the editor's text.
+        """
+        self.level_file = level_file
+        self.level = level.Level(level_file) if os.path.exists(level_file) else level.Level()
+        if not self.level.data:
+            self.level = level.Level()  # The file was not a level, start over rather than losing it on save
+        self.level.level_file = level_file
+        self.font = font
+        self.tool = 'static'
+        self.drag_start = None  # Snapped level point where the mouse went down
+        self.mouse = (0, 0)
+        self.history = []  # Kind of every item added, for undo
+        self.bucket_sugar = EDITOR_BUCKET_SUGAR
+        self.status = f"Editing {level_file}"
+
+    @property
+    def data(self):
+        return self.level.data
+
+    @staticmethod
+    def to_level(position):
+        """
+        Convert a screen position to a level point (y up), snapped to the grid.
+        """
+        x = round(position[0] / EDITOR_GRID) * EDITOR_GRID
+        y = round((HEIGHT - position[1]) / EDITOR_GRID) * EDITOR_GRID
+        return x, y
+
+    @staticmethod
+    def to_screen(x, y):
+        return x, HEIGHT - y
+
+    def handle_event(self, event):
+        """
+        Handle one Pygame event.
+
+        :return: 'play' when the level was saved and should be played, otherwise None.
+        """
+        if event.type == pg.MOUSEMOTION:
+            self.mouse = event.pos
+        elif event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
+            point = self.to_level(event.pos)
+            if self.tool == 'spout':
+                self.level.set_spout(*point)
+            else:
+                self.drag_start = point
+        elif event.type == pg.MOUSEBUTTONDOWN and event.button == 3:
+            self.remove_at(self.to_level(event.pos))
+        elif event.type == pg.MOUSEBUTTONUP and event.button == 1 and self.drag_start:
+            self.finish_drag(self.to_level(event.pos))
+        elif event.type == pg.KEYDOWN:
+            if event.key in TOOL_KEYS:
+                self.tool = TOOL_KEYS[event.key]
+                self.drag_start = None
+            elif event.key == pg.K_z:
+                self.undo()
+            elif event.key in (pg.K_UP, pg.K_DOWN):
+                step = 10 if event.key == pg.K_UP else -10
+                self.level.set_number_sugar_grains(max(10, self.data["number_sugar_grains"] + step))
+            elif event.key in (pg.K_PLUS, pg.K_EQUALS, pg.K_KP_PLUS):
+                self.bucket_sugar += 5
+            elif event.key in (pg.K_MINUS, pg.K_KP_MINUS):
+                self.bucket_sugar = max(5, self.bucket_sugar - 5)
+            elif event.key == pg.K_s:
+                self.save()
+            elif event.key == pg.K_RETURN and self.save():
+                return 'play'
+        return None
+
+    def finish_drag(self, point):
+        """
+        Add the line or bucket dragged out from drag_start to point.
+        """
+        (x1, y1), (x2, y2) = self.drag_start, point
+        self.drag_start = None
+        if self.tool == 'static':
+            if (x1, y1) != (x2, y2):
+                self.level.add_static(x1, y1, x2, y2)
+                self.history.append('statics')
+        elif self.tool == 'bucket':
+            width, height = abs(x2 - x1), abs(y2 - y1)
+            if width and height:
+                self.level.add_bucket((x1 + x2) / 2, (y1 + y2) / 2, width, height, self.bucket_sugar)
+                self.history.append('buckets')
+
+    def undo(self):
+        if self.history:
+            self.data[self.history.pop()].pop()
+
+    def remove_at(self, point):
+        """
+        Remove the bucket or static line under a level point, if there is one.
+        """
+        x, y = point
+        for i, bucket in enumerate(self.data["buckets"]):
+            left, right, bottom, top = (value * SCALE for value in bucket.get("aabb") or level.bucket_aabb(bucket))
+            if left - PICK_DISTANCE <= x <= right + PICK_DISTANCE and bottom - PICK_DISTANCE <= y <= top + PICK_DISTANCE:
+                self.remove('buckets', i)
+                return
+        for i, static in enumerate(self.data["statics"]):
+            static = dict(level.STATIC_DEFAULTS, **static)
+            # The bounding box rules out most lines before the distance is measured
+            left, bottom, right, top = level.static_bbox(static)
+            if not (left - PICK_DISTANCE <= x <= right + PICK_DISTANCE and bottom - PICK_DISTANCE <= y <= top + PICK_DISTANCE):
+                continue
+            if distance_to_line(point, static) <= static["line_width"] / 2 + PICK_DISTANCE:
+                self.remove('statics', i)
+                return
+
+    def remove(self, kind, index):
+        del self.data[kind][index]
+        # Undo only takes back what was added, and this may have been one of those
+        if kind in self.history:
+            self.history.remove(kind)
+
+    def save(self):
+        """
+        Validate and save the level.
+
+        :return: True if it was saved.
+        """
+        try:
+            self.level.save_level()
+        except ValueError as e:
+            self.status = str(e)
+            return False
+        except OSError as e:
+            self.status = f"Could not save {self.level_file}: {e}"
+            return False
+        # The game must not play an older copy of this level from its cache
+        level_cache.levels.forget(self.level_file)
+        self.history = []  # Saving merged the lines, so they no longer match what was added
+        self.status = f"Saved {self.level_file}: {len(self.data['statics'])} lines, {len(self.data['buckets'])} buckets"
+        return True
+
+    def draw(self, screen):
+        """
+        Draw the level being edited and the editor's text.
+
+        :return: Number of draw calls made.
+        """
+        calls = 1
+        screen.fill('black')
+        for static in self.data["statics"]:
+            static = dict(level.STATIC_DEFAULTS, **static)
+            pg.draw.line(screen, pg.Color(static["color"]), self.to_screen(static["x1"], static["y1"]),
+                         self.to_screen(static["x2"], static["y2"]), static["line_width"])
+            calls += 1
+        for bucket in self.data["buckets"]:
+            left, right, bottom, top = (value * SCALE for value in level.bucket_aabb(bucket))
+            rect = pg.Rect(left, HEIGHT - top, right - left, top - bottom)
+            pg.draw.lines(screen, 'white', False, (rect.topleft, rect.bottomleft, rect.bottomright, rect.topright), 2)
+            screen.blit(self.font.render(str(bucket["needed_sugar"]), True, 'white'), (rect.left + 2, rect.top - 16))
+            calls += 2
+        spout = self.to_screen(self.data["spout_x"], self.data["spout_y"])
+        pg.draw.line(screen, (255, 165, 144), (spout[0], spout[1] - 10), spout, 5)
+        calls += 1
+
+        # What the drag would add if the mouse went up now
+        if self.drag_start:
+            start = self.to_screen(*self.drag_start)
+            end = self.to_screen(*self.to_level(self.mouse))
+            if self.tool == 'static':
+                pg.draw.line(screen, 'gray', start, end, 3)
+            else:
+                pg.draw.rect(screen, 'gray', pg.Rect(start, (0, 0)).union(pg.Rect(end, (0, 0))), 1)
+            calls += 1
+
+        lines = [f"Tool: {self.tool}   Grains: {self.data['number_sugar_grains']}   New bucket needs: {self.bucket_sugar}",
+                 self.status, HELP]
+        y = 10
+        for line in lines:
+            surface = self.font.render(line, True, 'yellow')
+            screen.blit(surface, (10, y))
+            y += surface.get_height() + 2
+            calls += 1
+        return calls
+
+
+def distance_to_line(point, static):
+    """
+    Distance in pixels from a point to a static line.
+    """
+    x, y = point
+    dx, dy = static["x2"] - static["x1"], static["y2"] - static["y1"]
+    length2 = dx * dx + dy * dy
+    t = 0.0 if not length2 else max(0.0, min(1.0, ((x - static["x1"]) * dx + (y - static["y1"]) * dy) / length2))
+    return math.hypot(x - (static["x1"] + t * dx), y - (static["y1"] + t * dy))
@@ -11,56 +11,96 @@ import pymunk  # Import Pymunk library
 import sys
 from settings import *
 import random
-import static_item
 from dynamic_item import *
-import dynamic_item
-import sugar_grain
-import bucket
-import level
+from grain_renderer import GrainRenderer, GRAIN_SIZE
+from dirty_rects import DirtyRects
+from simulation import Simulation
+from static_layer import StaticLayer
+from profiler import PhaseProfiler
+import argparse
+import cProfile
+import pstats
+import level_cache
+import replay
+import assets
+from level_editor import LevelEditor
 import message_display  
 from audio import *
 from HUD import HUD 
 import time
 
 class Game:
-    def __init__(self) -> None:
+    def __init__(self, profiler=None, show_overlay=False, record=None, replay_file=None, edit_file=None) -> None:
+        """
+        Initialize the game.
+
+        :param profiler: PhaseProfiler that times every phase of the game loop, or None.
+        :param show_overlay: Draw the profiler table on the screen (toggle with F3).
+        :param record: File to record the session's inputs to, or None.
+        :param replay_file: Replay file to play back instead of taking input, or None.
+        :param edit_file: Level file to open in the level editor instead of playing the game, or None.
+        """
         pg.init()
+        self.profiler = profiler or PhaseProfiler(enabled=False)
+        self.show_overlay = show_overlay and self.profiler.enabled
         self.screen = pg.display.set_mode(RES)
+        # Images and sounds are decoded in the background while the first frames are shown
+        assets.shared.start(background=ASSET_LOADING == 'background')
+        self.overlay_font = assets.shared.font(20)
         self.clock = pg.time.Clock()
         self.iter = 0
+        self.alpha = 1.0  # How far between the last two physics steps to draw
+        self.physics_rate = 0.0  # Measured physics steps per second
+        self.rate_time = time.perf_counter()
+        self.rate_steps = 0
         
         # Initialize font for HUD
-        self.font = pg.font.SysFont(None, 36)  # Default font, size 36
+        self.font = assets.shared.font(36)  # Default font, size 36
 
-        # Create a Pymunk space with gravity
         self.current_level = 0 # Start game at 0
-        self.level_complete = False
-        self.space = pymunk.Space()
-        self.space.gravity = (0, -9)  # Gravity pointing downwards in Pymunk's coordinate system
-        # Iterations defaults to 10. Higher is more accurate collison detection
-        self.space.iterations = 30 
-
-        self.drawing_lines = []
-        self.sugar_grains = []
-        self.buckets = []
-        self.statics = []
-        self.total_sugar_count = None
-        self.level_spout_position = None
-        self.level_grain_dropping = None
         self.mouse_down = False
-        self.current_line = None
         self.message_display = message_display.MessageDisplay(font_size=72)
         # loading the sound class
         self.sound = Sound()
-        # Load the intro image
-        self.intro_image = pg.image.load("./images/SugarPop.png").convert()  # Load the intro image
-        # Get new height based on correct scale
-        scale_height = self.intro_image.get_height() * WIDTH / self.intro_image.get_width()
-        self.intro_image = pg.transform.scale(self.intro_image, (WIDTH, int(scale_height)))  # Scale to screen resolution
-        
-        pg.time.set_timer(LOAD_NEW_LEVEL, 2000)  # Load in 2 seconds
+        # The physics of the game: Pymunk space, grains, buckets and statics
+        # A replay brings its own solver quality changes, so the controller stays off
+        self.sim = Simulation(self.sound, profiler=self.profiler, adaptive=ADAPTIVE_QUALITY and not replay_file)
+        self.sim.on_level_complete = self.level_completed
+        self.replay = replay_file is not None
+        if record:
+            self.sim.start_recording(replay.ReplayRecorder(record, self.sim.time_step))
+        if replay_file:
+            self.sim.player = replay.ReplayPlayer(replay_file)
+        # The intro image, scaled to the screen. Until it is decoded a loading screen stands in for it
+        self.loading_image = pg.Surface(RES)
+        text = self.overlay_font.render("Loading...", True, 'white')
+        self.loading_image.blit(text, text.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
+        self.intro_image = assets.shared.image("intro", RES, wait=False) or self.loading_image
+        # The level editor, when editing a level instead of playing through the game
+        self.edit_file = edit_file
+        self.editor = LevelEditor(edit_file, self.overlay_font) if edit_file else None
+        self.editor_view = self.editor  # Kept while the edited level is being tested
+        if self.editor:
+            self.intro_image = None
+        else:
+            self.sound.play_start_game()  # Once, while the intro is shown
+            if self.replay:
+                pg.time.set_timer(LOAD_NEW_LEVEL, 0)  # The replay loads its own levels
+            else:
+                pg.time.set_timer(LOAD_NEW_LEVEL, 2000)  # Load in 2 seconds
+                level_cache.levels.preload(LEVEL_FILE_NAME.replace("X", "1"))  # While the intro is up
         # creating the class for the head up display messages
         self.hud = HUD(self.screen)
+        # Draws all the sugar grains in one batch
+        self.grain_renderer = GrainRenderer()
+        # Walls, statics, buckets and finished lines drawn once into an off-screen layer
+        self.static_layer = StaticLayer(RES)
+        self.draw_calls = 0  # Draw calls made on the screen in the last frame
+        # Only redraw and push the parts of the screen that changed, see dirty_rects.py
+        self.render_path = RENDER_PATH
+        self.dirty_rects = DirtyRects(RES)
+        self.drawn_message = None  # Message shown in the last frame
+        self.pixels_pushed = 0  # Pixels sent to the display in the last frame
         #use to chnage gravity attributes 
         self.gravity_direction = 1
         self.gravity_pos = "Down"
@@ -83,91 +123,83 @@ class Game:
 
 
     def load_level(self, levelnumber=0):
-        # Destroy any current game objects
-        for item in self.sugar_grains:
-            item.delete()  # Delete all sugar grains
-        for item in self.drawing_lines:
-            item.delete() 
-        for item in self.buckets:
-            item.delete() 
-        for item in self.statics:
-            item.delete() 
-        self.sugar_grains = []
-        self.drawing_lines = []  # Clear the list
-        self.buckets = []
-        self.statics = []
- 
         new_level = LEVEL_FILE_NAME.replace("X", str(levelnumber))
-        self.level = level.Level(new_level)
-        
         # Make sure the file was found
-        if not self.level or not self.level.data:
+        if not self.sim.load_level(new_level):
             return False
         else:  # Do final steps to start the level
-            self.level_grain_dropping = False
-            self.level_spout_position = (self.level.data['spout_x'], self.level.data['spout_y'])
-            self.build_main_walls()
-
-            # Load buckets
-            for nb in self.level.data['buckets']:
-                self.buckets.append(bucket.Bucket(self.space, nb['x'], nb['y'], nb['width'], nb['height'], nb['needed_sugar']))
-            # Load static items
-            for nb in self.level.data['statics']:
-                self.statics.append(static_item.StaticItem(self.space, nb['x1'], nb['y1'], nb['x2'], nb['y2'], nb['color'], nb['line_width'], nb['friction'], nb['restitution']))
-                
-            self.total_sugar_count = self.level.data['number_sugar_grains']
-            pg.time.set_timer(START_FLOW, 5 * 1000)  # 5 seconds
             self.message_display.show_message("Level Up", 10)
-            self.level_complete = False
-           
-
+            # Get the next level ready while this one is played
+            level_cache.levels.preload(LEVEL_FILE_NAME.replace("X", str(levelnumber + 1)))
             return True
 
-    def build_main_walls(self):
-        '''Build the walls, ceiling, and floor of the screen'''
-        # Floor
-        floor = static_item.StaticItem(self.space, 0, 0, WIDTH, 0, 'red', 5)
-        self.statics.append(floor)
-        # Left Wall
-        left_wall = static_item.StaticItem(self.space, 0, 0, 0, HEIGHT, 'red')
-        self.statics.append(left_wall)
-        # Right Wall
-        right_wall = static_item.StaticItem(self.space, WIDTH, 0, WIDTH, HEIGHT, 'red')
-        self.statics.append(right_wall)
-        # Ceiling
-        ceiling = static_item.StaticItem(self.space, 0, HEIGHT, WIDTH, HEIGHT, 'red')
-        self.statics.append(ceiling)
-    
-    def check_all_buckets_exploded(self):
+    def test_level(self):
+        """
+        Leave the editor and play the level just saved.
+        """
+        self.editor = None
+        if self.sim.load_level(self.edit_file):
+            self.message_display.show_message("Testing level, E to edit", 2)
+        else:
+            self.open_editor()
+
+    def open_editor(self):
+        """
+        Go back to the editor from testing a level.
+        """
+        pg.time.set_timer(LOAD_NEW_LEVEL, 0)
+        self.sim.clear()
+        self.message_display.message = None
+        self.editor = self.editor_view
+
+    def level_completed(self):
         """
-        Check if all buckets have exploded.
+        Called by the simulation when all the buckets have exploded.
         """
-       #self.moving_object.delete() . # does not work part of gold
-        return all(bucket.exploded for bucket in self.buckets)
+        self.message_display.show_message("Level Complete!", 2)
+        #playing the sound of level complete
+        self.sound.play_level_complete()
+
+        if not self.replay:  # A replay loads the next level itself, when the recording did
+            pg.time.set_timer(LOAD_NEW_LEVEL, 2000)  # Schedule next level load
 
     def update(self):
         '''Update the program physics'''
-        # pausing game
-        if self.is_pause == True:
+        # pausing game. The clock keeps ticking and the time is thrown away,
+        # otherwise the whole pause would be simulated in one go on resume
+        if self.is_pause == True or self.editor:
+            self.clock.tick(FPS)
             return
         
         # Keep an overall iterator
         self.iter += 1
-        
-        # Calculate time since last frame
-        delta_time = self.clock.tick(FPS) / 1000.0  # Convert milliseconds to seconds
 
-        # Cap delta_time to prevent instability from large time steps
-        time_step = min(delta_time, MAX_TIME_STEP)
-
-        # Step the physics simulation forward with the calculated time_step
-        self.space.step(time_step)
+        if self.replay:
+            # Levels are loaded by the replay rather than by the timer
+            if self.sim.level and self.intro_image:
+                self.intro_image = None
+            if self.sim.player.done and self.sim.total_steps >= self.sim.player.end_step and not self.sim.paused:
+                self.sim.set_paused(True)
+                pg.time.set_timer(LOAD_NEW_LEVEL, 0)
+                self.message_display.show_message("Replay finished", 5)
         
-        # Update our game counter
-        if self.iter == 60:
-            self.iter = 0
-      
-        pg.display.set_caption(f'Level : {self.current_level} fps: {self.clock.get_fps():.1f}')
+        # Calculate time since last frame
+        with self.profiler.phase('clock.tick'):  # Time spent waiting for the next frame
+            delta_time = self.clock.tick(FPS) / 1000.0  # Convert milliseconds to seconds
+
+        # Run the fixed physics steps that fit in this frame, and remember how far
+        # into the next step we are so the grains can be drawn in between
+        self.alpha = self.sim.advance(delta_time)
+        # Play the sounds the physics steps asked for, bursts merged into one
+        with self.profiler.phase('audio.flush'):
+            self.sound.flush()
+
+        # Measure the physics rate separately from the render rate
+        now = time.perf_counter()
+        if now - self.rate_time >= 1.0:
+            self.physics_rate = (self.sim.total_steps - self.rate_steps) / (now - self.rate_time)
+            self.rate_time, self.rate_steps = now, self.sim.total_steps
+        pg.display.set_caption(f'Level : {self.current_level} fps: {self.clock.get_fps():.1f} physics: {self.physics_rate:.0f} steps/s draw calls: {self.draw_calls} pixels: {self.pixels_pushed}')
         
         # Only do the following every 20 frames for less system stress
         if self.iter % 20 == 0:
@@ -175,41 +207,13 @@ class Game:
             self.message_display.update()
             #update the moving object
             # self.moving_object.update() does not work part of gold
-            # Calculate buckets count by counting each grain's position
-            # First, explode or reset the counter on each bucket
-            for bucket in self.buckets:
-                if bucket.count >= bucket.needed_sugar:
-                    bucket.explode(self.sugar_grains)
-                    # If all the buckets are gone, level up!
-                    if not self.level_complete and self.check_all_buckets_exploded():
-                        self.level_complete = True
-                        
-                        self.message_display.show_message("Level Complete!", 2)
-                        #playing the sound of level complete
-                        self.sound.play_level_complete()
-
-                        pg.time.set_timer(LOAD_NEW_LEVEL, 2000)  # Schedule next level load
-                else:
-                    bucket.count_reset()
-            # Count the grains in the un-exploded buckets
-            for grain in self.sugar_grains:
-                for bucket in self.buckets:
-                    bucket.collect(grain)
-                
-            # Drop sugar if needed
-            if self.level_grain_dropping:
-                # Create new sugar to drop
-                new_sugar = sugar_grain.sugar_grain(self.space, self.level_spout_position[0], self.level_spout_position[1], 0.1)
-                self.sugar_grains.append(new_sugar)
-                # Check if it's time to stop
-                if len(self.sugar_grains) >= self.total_sugar_count:
-                    self.level_grain_dropping = False
         # initializing the headup display module to becalled 
-        self.hud.update(
-        total_sugar=self.total_sugar_count,
-        sugar_in_buckets=self.buckets,  # Pass the list of bucket objects
-        sugar_left= len(self.sugar_grains),
-        level_count=self.current_level,gravity_pos = self.gravity_pos)
+        with self.profiler.phase('hud.update'):
+            self.hud.update(
+            total_sugar=self.sim.total_sugar_count,
+            sugar_in_buckets=self.sim.buckets,  # Pass the list of bucket objects
+            sugar_left= self.sim.grains_spawned,
+            level_count=self.current_level,gravity_pos = self.gravity_pos)
         
        
 
@@ -217,14 +221,14 @@ class Game:
     def draw_hud(self):
         """Drawing the head up display  the number of grains."""
          #   self.screen.blit(text_surface, (10, 10))  # Position at top-left corner
-        if self.total_sugar_count:
+        if self.sim.total_sugar_count:
             self.hud.draw() # calling the draw function from the head up display module
     def toggle_gravity(self):
         """reversing the gravity direction and update Head up display ."""
         self.gravity_direction *= -1  # changing direction between 1 and -1
         
         #changin the gravity of 
-        self.space.gravity = (0, -9 * self.gravity_direction)
+        self.sim.set_gravity(self.gravity_direction)
         if self.gravity_direction == -1:  # check if the gravity direction is posit
             self.gravity_pos = "Up"  # changing the position of the gravity 
         else:
@@ -235,6 +239,7 @@ class Game:
     def pause_game(self):
         #self.message_display.show_message('Game is pause',1)
         self.is_pause = not(self.is_pause)
+        self.sim.set_paused(self.is_pause)
         if self.is_pause == True:
             self.message_display.show_message('Game is pause',1)
         else:
@@ -248,32 +253,43 @@ class Game:
 
     def draw(self):
         '''Draw the overall game. Should call individual item draw() methods'''
-        # Clear the screen
-        self.screen.fill('black')
+        if self.editor:
+            self.draw_calls = self.editor.draw(self.screen)
+            pg.display.update()
+            self.pixels_pushed = WIDTH * HEIGHT
+            # Whatever the game drew before is gone, start it over with a full frame
+            self.static_layer.version = None
+            return
+        # The whole screen changes with the intro or a new static layer, and
+        # per-object grains can't be drawn in parts
+        if self.render_path == 'full' or self.intro_image or self.grain_renderer.mode == 'per_object' \
+                or self.static_layer.version != self.sim.geometry_version:
+            self.draw_full()
+        else:
+            self.draw_dirty()
+        self.profiler.gauge('display.pixels', self.pixels_pushed)
+
+    def draw_full(self):
+        '''Redraw everything and push the whole screen to the display'''
+        # Clear the screen to the cached static geometry: walls, statics,
+        # buckets, finished user lines and the nozzle
+        with self.profiler.phase('draw.static'):
+            draw_calls = self.static_layer.draw(self.screen, self.sim)
         # Only show the intro screen if we haven't loaded a level yet
+        if self.intro_image is self.loading_image:
+            self.intro_image = assets.shared.image("intro", RES, wait=False) or self.loading_image
         if self.intro_image:
-            self.sound.play_start_game()
             self.screen.blit(self.intro_image, (0, 0))  # Draw the intro image
+            draw_calls += 1
 
-    
-        for bucket in self.buckets:
-            bucket.draw(self.screen)
-
-        # Draw each sugar grain
-        for grain in self.sugar_grains:
-            grain.draw(self.screen)
+        # Draw all the sugar grains
+        screen_pos = self.grain_renderer.screen_positions(self.sim.sugar_grains, self.alpha)
+        with self.profiler.phase('draw.grains'):
+            draw_calls += self.grain_renderer.draw(self.screen, self.sim.sugar_grains, self.alpha, screen_pos)
 
         # Draw the current dynamic line
-        if self.current_line is not None:
-            self.current_line.draw(self.screen)
-        
-        # Draw the user-drawn lines
-        for line in self.drawing_lines:
-            line.draw(self.screen)
-            
-        # Draw any static items
-        for static in self.statics:
-            static.draw(self.screen)
+        if self.sim.current_line is not None:
+            draw_calls += self.sim.current_line.draw(self.screen)
         #PArt of gold but does not work
         ##self.screen.fill((255, 255, 255)) 
         # self.moving_object.draw(self.screen)
@@ -282,58 +298,130 @@ class Game:
         # #print(self.moving_object.body.position)
         # self.clock.tick(60)
 
-        # Draw the nozzle (Remember to subtract y from the height)
-        if self.level_spout_position:
-            pg.draw.line(
-                self.screen, 
-                (255, 165, 144), 
-                (self.level_spout_position[0], HEIGHT - self.level_spout_position[1] - 10), 
-                (self.level_spout_position[0], HEIGHT - self.level_spout_position[1]), 
-                5
-            )
-        
         # Draw the heads-up display
-        if self.total_sugar_count:
-            self.hud.draw()
+        if self.sim.total_sugar_count:
+            with self.profiler.phase('draw.hud'):
+                self.hud.draw()
+            draw_calls += 1
 
         # Show any messages needed        
-        self.message_display.draw(self.screen)
+        if self.message_display.message:
+            with self.profiler.phase('draw.messages'):
+                self.message_display.draw(self.screen)
+            draw_calls += 1
+
+        if self.show_overlay:
+            draw_calls += self.profiler.draw_overlay(self.screen, self.overlay_font)
+        self.draw_calls = draw_calls
 
         # Update the display
-        pg.display.update()
+        with self.profiler.phase('display.update'):
+            pg.display.update()
+        self.pixels_pushed = WIDTH * HEIGHT
+
+        # Remember this frame so the next one can be drawn in parts
+        if self.render_path == 'dirty':
+            dirty = self.dirty_rects
+            dirty.mark_grains(screen_pos, GRAIN_SIZE)
+            line = self.sim.current_line
+            dirty.track('line', line.rect() if line is not None else None)
+            dirty.track('hud', self.hud.rect if self.sim.total_sugar_count else None)
+            dirty.track('message', self.message_display.rect(self.screen))
+            dirty.track('overlay', self.profiler.overlay_rect if self.show_overlay else None)
+            self.drawn_message = self.message_display.message
+            dirty.end_frame()
+
+    def draw_dirty(self):
+        '''Redraw only the parts of the screen that changed and push just those to the display'''
+        dirty = self.dirty_rects
+        grains = self.sim.sugar_grains
+        screen_pos = self.grain_renderer.screen_positions(grains, self.alpha)
+        line = self.sim.current_line
+        show_hud = bool(self.sim.total_sugar_count)
+        hud_changed = self.hud.dirty
+        if show_hud and hud_changed:
+            self.hud.compose()
+        message = self.message_display.message
+        with self.profiler.phase('draw.dirty'):
+            dirty.mark_grains(screen_pos, GRAIN_SIZE)
+            # Redrawing one thing can dirty the area of another on top of it, so
+            # go round until the dirty area stops growing
+            while True:
+                tiles = dirty.mask.sum()
+                touching = dirty.touching(screen_pos, GRAIN_SIZE)
+                draw_line = dirty.track('line', line.rect() if line is not None else None)
+                draw_hud = dirty.track('hud', self.hud.rect if show_hud else None, hud_changed)
+                draw_message = dirty.track('message', self.message_display.rect(self.screen), message != self.drawn_message)
+                # The overlay is redrawn every frame, where it was last frame until it has been drawn
+                dirty.track('overlay', self.profiler.overlay_rect if self.show_overlay else None)
+                if dirty.mask.sum() == tiles:
+                    break
+            restore = dirty.rects()
+
+        # Wipe the dirty areas back to the static geometry
+        with self.profiler.phase('draw.static'):
+            draw_calls = self.static_layer.restore(self.screen, restore)
+        with self.profiler.phase('draw.grains'):
+            draw_calls += self.grain_renderer.draw(self.screen, grains, screen_pos=screen_pos[touching])
+        if draw_line:
+            draw_calls += line.draw(self.screen)
+        if draw_hud:
+            with self.profiler.phase('draw.hud'):
+                self.hud.draw()
+            draw_calls += 1
+        if draw_message:
+            with self.profiler.phase('draw.messages'):
+                self.message_display.draw(self.screen)
+            draw_calls += 1
+        self.drawn_message = message
+        if self.show_overlay:
+            draw_calls += self.profiler.draw_overlay(self.screen, self.overlay_font)
+            # The overlay is opaque, so its new area only has to be pushed, not wiped first
+            dirty.track('overlay', self.profiler.overlay_rect)
+        self.draw_calls = draw_calls
+
+        # Push just the changed rectangles to the display
+        rects = dirty.rects()
+        with self.profiler.phase('display.update'):
+            pg.display.update(rects)
+        self.pixels_pushed = sum(rect.width * rect.height for rect in rects)
+        dirty.end_frame()
 
     def check_events(self):
         '''Check for keyboard and mouse events'''
 
         for event in pg.event.get():
             if event.type == EXIT_APP or event.type == pg.QUIT or (event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE):
+                self.sim.stop_recording()
                 pg.quit()
                 sys.exit()
+            elif event.type == pg.KEYDOWN and event.key == pg.K_F3 and self.profiler.enabled:
+                self.show_overlay = not self.show_overlay
+            elif self.editor:
+                if self.editor.handle_event(event) == 'play':
+                    self.test_level()
+            elif self.edit_file and (event.type == LOAD_NEW_LEVEL or (event.type == pg.KEYDOWN and event.key == pg.K_e)):
+                self.open_editor()  # Done testing the level
+            elif self.replay:
+                continue  # Everything else comes from the replay
             elif event.type == pg.MOUSEBUTTONDOWN:
                 self.mouse_down = True
                 # Get mouse position and start a new dynamic line
                 mouse_x, mouse_y = pg.mouse.get_pos()
-                self.current_line = dynamic_item.DynamicItem(self.space, 'blue')
-                self.current_line.add_vertex(mouse_x, mouse_y)
+                self.sim.begin_line(mouse_x, mouse_y)
                 
             elif event.type == pg.MOUSEBUTTONUP:
                 self.mouse_down = False
-                if self.current_line:
-                    self.drawing_lines.append(self.current_line)
-                    self.current_line = None
+                self.sim.end_line()
                 
             elif event.type == pg.MOUSEMOTION and self.mouse_down:
                 # Get mouse position
                 mouse_x, mouse_y = pg.mouse.get_pos()
                 if mouse_x == 0 or mouse_x == WIDTH or mouse_y == 0 or mouse_y == HEIGHT:
                     self.mouse_down = False
-                if self.current_line and self.iter % 10 == 0:
-                    self.current_line.add_vertex(mouse_x, mouse_y)
+                if self.iter % 10 == 0:
+                    self.sim.extend_line(mouse_x, mouse_y)
 
-            elif event.type == START_FLOW:
-                self.level_grain_dropping = True
-                # Disable the timer after the first trigger
-                pg.time.set_timer(START_FLOW, 0)
                 #checking if the gravity is bring change
             elif event.type == pg.KEYDOWN: #createing a check of even when G is press the gravity change
                 if event.key == pg.K_g:  # Press 'G' to reverse gravity
@@ -355,13 +443,37 @@ class Game:
     def run(self):
         '''Run the main game loop'''
         while True:
-            self.check_events()
-            self.update()
-            self.draw()
+            with self.profiler.phase('check_events'):
+                self.check_events()
+            with self.profiler.phase('update'):
+                self.update()
+            with self.profiler.phase('draw'):
+                self.draw()
 
 def main():
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser(description="Sugar Pop")
+    parser.add_argument("--metrics", metavar="FILE", help="Time every phase of the game loop and write the percentiles to FILE (.json or .csv) on exit")
+    parser.add_argument("--overlay", action="store_true", help="Show the phase timings on screen (F3 toggles)")
+    parser.add_argument("--profile", metavar="FILE", help="Run the game under cProfile and write the stats to FILE")
+    parser.add_argument("--record", metavar="FILE", help="Record the session's inputs to FILE for replay.py")
+    parser.add_argument("--edit", metavar="FILE", help="Open the level FILE (new or existing) in the level editor")
+    args = parser.parse_args()
+
+    profiler = PhaseProfiler(enabled=bool(args.metrics or args.overlay))
+    game = Game(profiler, args.overlay, record=args.record, edit_file=args.edit)
+    code_profile = cProfile.Profile() if args.profile else None
+    try:
+        if code_profile:
+            code_profile.enable()
+        game.run()
+    finally:
+        game.sim.stop_recording()
+        if code_profile:
+            code_profile.disable()
+            code_profile.dump_stats(args.profile)
+            pstats.Stats(code_profile).sort_stats('cumulative').print_stats(25)
+        if args.metrics:
+            profiler.dump(args.metrics)
 
 if __name__ == '__main__':
     main()
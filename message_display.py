@@ -7,6 +7,7 @@
 #############################################################
 import pygame as pg
 import time
+import assets
 
 class MessageDisplay:
     def __init__(self, font_name=None, font_size=36, color=(255, 255, 255)):
@@ -18,7 +19,8 @@ class MessageDisplay:
         :param font_size: The size of the font.
         :param color: The color of the text (default is white).
         """
-        self.font = pg.font.SysFont(font_name, font_size)
+        # SysFont searches the system fonts, which is slow and only needed for a named font
+        self.font = pg.font.SysFont(font_name, font_size) if font_name else assets.shared.font(font_size)
         self.color = color
         self.message = None
         self.display_until = 0
@@ -40,6 +42,16 @@ class MessageDisplay:
         if self.message and time.time() > self.display_until:
             self.message = None
 
+    def rect(self, screen):
+        """
+        Screen rectangle the current message is drawn in, or None if there is no message.
+        """
+        if not self.message or not screen:
+            return None
+        rect = pg.Rect((0, 0), self.font.size(self.message))
+        rect.center = (screen.get_width() // 2, screen.get_height() // 2)
+        return rect
+
     def draw(self, screen):
         """
         Draw the message on the screen, if there is an active message.
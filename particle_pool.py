@@ -0,0 +1,310 @@
+#############################################################
+# Module Name: Sugar Pop Particle Pool Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Grains as round particles moved by a NumPy solver instead of Pymunk
+#############################################################
+import numpy as np
+import pymunk
+from settings import SCALE, PARTICLE_ITERATIONS, SLEEP_TIME_THRESHOLD, IDLE_SPEED_THRESHOLD
+from grain_pool import GrainPool, GRAIN_MASS, GRAIN_SIZE
+from bucket import blast_impulses
+
+RELAXATION = 0.5  # Share of a grain/grain overlap fixed per pass, more shakes the pile
+NEIGHBOUR_MARGIN = 1.5  # Pairs closer than this many diameters are checked during a step
+# Grid cells a grain is compared with: its own and the four after it, so every pair comes up once
+NEIGHBOUR_CELLS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+class ParticlePool(GrainPool):
+    """
+    A GrainPool whose grains are not Pymunk bodies: every grain is a circle in
+    the position arrays, moved by a small position-based solver. Each step the
+    grains fall, overlapping pairs found through a grid are pushed apart, and
+    grains are pushed out of every static segment and polygon in the space
+    (walls, statics, bucket walls and fills, drawn lines). Velocities come
+    from how far the grains moved. There are no per-grain objects at all, so
+    it keeps up with far more grains than Pymunk, at the cost of rougher
+    physics: no bounce, and friction is a damping of grains that touch something.
+    """
+    def __init__(self, space, friction=0.3, capacity=256, iterations=PARTICLE_ITERATIONS):
+        """
+        Initialize an empty particle pool.
+
+        :param space: The Pymunk space whose static shapes the grains collide with.
+        :param friction: Share of its speed a touching grain loses every step.
+        :param capacity: Number of grains to reserve room for in the arrays.
+        :param iterations: Constraint passes per step.
+        """
+        self.space = space
+        self.shape = 'particle'
+        self.friction = friction
+        self.iterations = iterations
+        self.radius = GRAIN_SIZE / 2
+        self.count = 0
+        self.bodies = []  # Particles have no bodies, kept so code written for GrainPool still works
+        self.shapes = []
+        self.free = []
+        self.allocated = 0
+        self.recycled = 0
+        self._positions = np.zeros((capacity, 2), dtype=np.float64)
+        self._previous = np.zeros((capacity, 2), dtype=np.float64)
+        self._velocities = np.zeros((capacity, 2), dtype=np.float64)
+        self._idle = np.zeros(capacity, dtype=np.float64)  # Seconds each grain has been slower than IDLE_SPEED_THRESHOLD
+        self._played = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def velocities(self):
+        return self._velocities[:self.count]
+
+    def _reserve(self, size):
+        """
+        Grow the arrays so they can hold at least size grains.
+        """
+        capacity = len(self._played)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ('_positions', '_previous', '_velocities', '_idle', '_played'):
+            setattr(self, name, self._grow(getattr(self, name), capacity))
+
+    def spawn(self, points, velocity=(0, 0)):
+        """
+        Create many grains at once.
+
+        :param points: Sequence of (x, y) positions in Pygame coordinates.
+        :param velocity: Starting velocity of every new grain.
+        :return: Index of the first new grain.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2) / SCALE
+        start = self.count
+        self._reserve(start + len(points))
+        self.count += len(points)
+        self._positions[start:self.count] = points
+        self._previous[start:self.count] = points
+        self._velocities[start:self.count] = velocity
+        self._idle[start:self.count] = 0.0
+        self._played[start:self.count] = False
+        self.allocated += len(points)
+        return start
+
+    def sync(self):
+        """
+        Nothing to copy, the positions live in the arrays already.
+        """
+
+    def delete(self, indices):
+        """
+        Remove many grains at once from the pool.
+
+        :param indices: Indices of the grains to remove, or a boolean mask.
+        :return: Number of grains removed.
+        """
+        remove = np.zeros(self.count, dtype=bool)
+        remove[indices] = True
+        removed = int(remove.sum())
+        if not removed:
+            return 0
+        keep = ~remove
+        kept = self.count - removed
+        for array in (self._positions, self._previous, self._velocities, self._idle, self._played):
+            array[:kept] = array[:self.count][keep]
+        self.count = kept
+        return removed
+
+    def asleep(self, indices):
+        """
+        Check if all the given grains have been idle for SLEEP_TIME_THRESHOLD seconds.
+        """
+        return bool((self._idle[:self.count][indices] >= SLEEP_TIME_THRESHOLD).all())
+
+    def wake(self):
+        self._idle[:self.count] = 0.0
+
+    def clear(self):
+        self.count = 0
+
+    def blast(self, center):
+        """
+        Push the grains away from an exploding bucket, like Bucket.explode() does to Pymunk bodies.
+
+        :param center: Center of the explosion in Pymunk coordinates.
+        """
+        if not self.count:
+            return
+        near, impulses = blast_impulses(self.positions, np.asarray(center, dtype=np.float64))
+        self.velocities[near] += impulses[near] / GRAIN_MASS
+        self._idle[:self.count][near] = 0.0
+
+    def colliders(self):
+        """
+        Every static, solid edge in the space: segments and the sides of polygons.
+
+        :return: Arrays of the edge start points (M, 2), end points (M, 2) and radii (M).
+        """
+        starts, ends, radii = [], [], []
+        for shape in self.space.shapes:
+            if shape.sensor or shape.body.body_type != pymunk.Body.STATIC:
+                continue
+            if isinstance(shape, pymunk.Segment):
+                starts.append(tuple(shape.body.local_to_world(shape.a)))
+                ends.append(tuple(shape.body.local_to_world(shape.b)))
+                radii.append(shape.radius)
+            elif isinstance(shape, pymunk.Poly):
+                vertices = [tuple(shape.body.local_to_world(v)) for v in shape.get_vertices()]
+                starts += vertices
+                ends += vertices[1:] + vertices[:1]
+                radii += [shape.radius] * len(vertices)
+        return (np.array(starts, dtype=np.float64).reshape(-1, 2), np.array(ends, dtype=np.float64).reshape(-1, 2),
+                np.array(radii, dtype=np.float64))
+
+    def neighbours(self, positions):
+        """
+        Find the pairs of grains close enough to touch during this step, with a grid
+        of cells one diameter wide: touching grains are in the same or next cells.
+
+        :param positions: (N, 2) array of grain positions.
+        :return: Two arrays with the first and second grain of every pair.
+        """
+        count = len(positions)
+        cells = np.floor(positions / (2 * self.radius)).astype(np.int64)
+        cells -= cells.min(axis=0)
+        height = int(cells[:, 1].max()) + 3  # Room for the row above and below without wrapping
+        keys = cells[:, 0] * height + cells[:, 1]
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        # First grain and number of grains of every occupied cell
+        starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+        occupied = sorted_keys[starts]
+        sizes = np.diff(np.append(starts, count))
+        rank = np.arange(count)
+
+        first, second = [], []
+        for dx, dy in NEIGHBOUR_CELLS:
+            target = sorted_keys + dx * height + dy
+            cell = np.minimum(np.searchsorted(occupied, target), len(occupied) - 1)
+            found = occupied[cell] == target
+            for k in range(int(sizes.max())):
+                other = starts[cell] + k
+                valid = found & (k < sizes[cell])
+                if (dx, dy) == (0, 0):
+                    valid &= other > rank  # Each pair in a cell once, and not a grain with itself
+                first.append(order[valid])
+                second.append(order[other[valid]])
+        first = np.concatenate(first)
+        second = np.concatenate(second)
+        offsets = positions[second] - positions[first]
+        close = (offsets ** 2).sum(axis=1) < (2 * self.radius * NEIGHBOUR_MARGIN) ** 2
+        return first[close], second[close]
+
+    def solve_pairs(self, positions, first, second):
+        """
+        Push every overlapping pair of grains apart.
+
+        :return: Mask of the grains that touched another one.
+        """
+        offsets = positions[second] - positions[first]
+        distance = np.hypot(offsets[:, 0], offsets[:, 1])
+        overlap = 2 * self.radius - distance
+        hit = overlap > 0
+        touched = np.zeros(len(positions), dtype=bool)
+        if not hit.any():
+            return touched
+        first, second, offsets, distance, overlap = first[hit], second[hit], offsets[hit], distance[hit], overlap[hit]
+        # Grains right on top of each other are split vertically
+        normals = np.divide(offsets, distance[:, None], out=np.tile([0.0, 1.0], (len(offsets), 1)), where=distance[:, None] > 0)
+        push = normals * (overlap * 0.5 * RELAXATION)[:, None]
+        count = len(positions)
+        for axis in (0, 1):
+            positions[:, axis] += np.bincount(second, push[:, axis], count) - np.bincount(first, push[:, axis], count)
+        touched[first] = True
+        touched[second] = True
+        return touched
+
+    def sides(self, positions, starts, ends):
+        """
+        Which side of every edge each grain is on, +1 or -1 along the edge normal.
+
+        :return: (N, M) array of signs.
+        """
+        edges = ends - starts
+        cross = edges[None, :, 0] * (positions[:, None, 1] - starts[None, :, 1]) \
+            - edges[None, :, 1] * (positions[:, None, 0] - starts[None, :, 0])
+        return np.where(cross < 0, -1.0, 1.0)
+
+    def solve_edges(self, positions, sides, starts, ends, radii):
+        """
+        Push the grains out of every static edge they overlap, back to the side
+        they started the step on. A grain that went through an edge, falling
+        fast or squeezed by the pile above, is pushed all the way back.
+
+        :param sides: Side of every edge each grain started the step on, see sides().
+        :return: Mask of the grains that touched an edge.
+        """
+        touched = np.zeros(len(positions), dtype=bool)
+        if not len(starts):
+            return touched
+        edges = ends - starts
+        length = np.maximum(np.hypot(edges[:, 0], edges[:, 1]), 1e-9)
+        normals = np.stack((-edges[:, 1], edges[:, 0]), axis=1) / length[:, None]
+        # Closest point of every edge to every grain, one (N, M) array per axis
+        x = positions[:, 0:1] - starts[:, 0]
+        y = positions[:, 1:2] - starts[:, 1]
+        t = (x * edges[:, 0] + y * edges[:, 1]) / length ** 2
+        # Beside the edge, the distance counts from the start side and goes negative past it.
+        # The edge is stretched by the contact distance at both ends so a grain can't slip
+        # out through the joint of two edges. Around the end points it is just the distance to the end
+        reach = (self.radius + radii) / length
+        beside = (t > -reach) & (t < 1 + reach)
+        signed = (x * normals[:, 0] + y * normals[:, 1]) * sides
+        t = np.clip(t, 0.0, 1.0)
+        x -= t * edges[:, 0]
+        y -= t * edges[:, 1]
+        distance = np.hypot(x, y)
+        depth = self.radius + radii - np.where(beside, signed, distance)
+        grain, edge = np.nonzero(depth > 0)
+        if not len(grain):
+            return touched
+        d = distance[grain, edge][:, None]
+        offsets = np.stack((x[grain, edge], y[grain, edge]), axis=1)
+        around = np.divide(offsets, d, out=np.tile([0.0, 1.0], (len(grain), 1)), where=d > 0)
+        push = np.where(beside[grain, edge][:, None], normals[edge] * sides[grain, edge][:, None], around)
+        push *= depth[grain, edge][:, None]
+        for axis in (0, 1):
+            positions[:, axis] += np.bincount(grain, push[:, axis], len(positions))
+        touched[grain] = True
+        return touched
+
+    def step(self, dt, gravity):
+        """
+        Move every grain forward by dt seconds.
+
+        :param dt: Simulated seconds.
+        :param gravity: Gravity vector in meters/second^2.
+        """
+        if not self.count:
+            return
+        old = self.positions
+        velocities = self.velocities
+        velocities += np.asarray(tuple(gravity), dtype=np.float64) * dt
+        new = old + velocities * dt
+        starts, ends, radii = self.colliders()
+        sides = self.sides(old, starts, ends)
+        first, second = self.neighbours(new)
+        touched = np.zeros(self.count, dtype=bool)
+        for _ in range(self.iterations):
+            touched |= self.solve_pairs(new, first, second)
+            touched |= self.solve_edges(new, sides, starts, ends, radii)
+
+        # The velocity is what the grain really moved, minus friction on anything it touched
+        velocities[:] = (new - old) / dt
+        velocities[touched] *= 1.0 - self.friction
+        old[:] = new
+        idle = self._idle[:self.count]
+        slow = (velocities ** 2).sum(axis=1) < IDLE_SPEED_THRESHOLD ** 2
+        idle[:] = np.where(slow, idle + dt, 0.0)
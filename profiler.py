@@ -0,0 +1,127 @@
+#############################################################
+# Module Name: Sugar Pop Profiler Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Per-phase timing of the game loop with rolling percentiles
+#############################################################
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class PhaseProfiler:
+    def __init__(self, enabled=True, window=600):
+        """
+        Initialize the profiler.
+
+        :param enabled: When False, phase() does nothing so it can stay in the hot path.
+        :param window: Number of recent samples kept per phase for the percentiles.
+        """
+        self.enabled = enabled
+        self.window = window
+        self.samples = {}  # Phase name -> recent durations in milliseconds
+        self.gauges = {}  # Name -> latest value, for things that are not timings
+        self.null = nullcontext()
+        self.overlay_rect = None  # Screen area of the last drawn overlay
+
+    def phase(self, name):
+        """
+        Time a block of code as one phase:
+
+            with profiler.phase('space.step'):
+                space.step(dt)
+        """
+        if not self.enabled:
+            return self.null
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000.0)
+
+    def record(self, name, milliseconds):
+        """
+        Add one timing sample to a phase.
+        """
+        if not self.enabled:
+            return
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(milliseconds)
+
+    def gauge(self, name, value):
+        """
+        Report the current value of something that is not a timing, e.g. the solver iterations.
+        """
+        if self.enabled:
+            self.gauges[name] = value
+
+    def stats(self, name):
+        """
+        Rolling statistics of one phase.
+
+        :return: Dictionary with the sample count, mean and p50/p95/p99 in milliseconds.
+        """
+        samples = np.fromiter(self.samples.get(name, ()), dtype=np.float64)
+        if not len(samples):
+            return {"count": 0, "mean": 0.0, **{f"p{p}": 0.0 for p in PERCENTILES}}
+        values = np.percentile(samples, PERCENTILES)
+        return {"count": len(samples), "mean": float(samples.mean()),
+                **{f"p{p}": float(v) for p, v in zip(PERCENTILES, values)}}
+
+    def summary(self):
+        """
+        Statistics of every phase, plus the latest gauges.
+        """
+        return {"phases": {name: self.stats(name) for name in self.samples}, "gauges": dict(self.gauges)}
+
+    def dump(self, path):
+        """
+        Write the summary to a file, as CSV if the name ends in .csv and JSON otherwise.
+        """
+        summary = self.summary()
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["phase", "count", "mean_ms"] + [f"p{p}_ms" for p in PERCENTILES])
+                for name, stats in summary["phases"].items():
+                    writer.writerow([name, stats["count"], f"{stats['mean']:.4f}"] + [f"{stats[f'p{p}']:.4f}" for p in PERCENTILES])
+                for name, value in summary["gauges"].items():
+                    writer.writerow([name, "", value])
+        else:
+            with open(path, 'w') as f:
+                json.dump(summary, f, indent=4)
+
+    def draw_overlay(self, screen, font, position=(10, 200)):
+        """
+        Draw a table of the phases and their percentiles on the screen.
+        The area it covered is kept in overlay_rect.
+
+        :return: Number of draw calls made.
+        """
+        x, y = position
+        lines = [f"{'phase':<18}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        for name in sorted(self.samples):
+            stats = self.stats(name)
+            lines.append(f"{name:<18}{stats['p50']:>8.2f}{stats['p95']:>8.2f}{stats['p99']:>8.2f}")
+        for name, value in self.gauges.items():
+            lines.append(f"{name:<18}{value:>8}")
+        rect = None
+        for line in lines:
+            surface = font.render(line, True, 'yellow', 'black')
+            drawn = screen.blit(surface, (x, y))
+            rect = drawn if rect is None else rect.union(drawn)
+            y += surface.get_height()
+        self.overlay_rect = rect
+        return len(lines)
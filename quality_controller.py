@@ -0,0 +1,94 @@
+#############################################################
+# Module Name: Sugar Pop Quality Controller Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Adapts solver iterations and substeps to hold a step time target
+#############################################################
+from settings import *
+
+
+class QualityController:
+    def __init__(self, target_ms=TARGET_STEP_MS, iterations=(SOLVER_ITERATIONS_MIN, SOLVER_ITERATIONS_MAX),
+                 substeps=(SUBSTEPS_MIN, SUBSTEPS_MAX), interval=QUALITY_ADJUST_STEPS):
+        """
+        Initialize the quality controller.
+
+        :param target_ms: Milliseconds one physics step (all its substeps) should take.
+        :param iterations: Lowest and highest solver iterations to use.
+        :param substeps: Lowest and highest number of substeps per physics step.
+        :param interval: Physics steps between adjustments.
+        """
+        self.target_ms = target_ms
+        self.interval = interval
+
+        # Every combination of settings, from the most to the least accurate.
+        # Each substep repeats collision detection, which costs more than the
+        # solver iterations once there are many grains, so iterations come down
+        # first and a substep is only given up when they are at their lowest.
+        low, high = iterations
+        iteration_options = []
+        while high > low:
+            iteration_options.append(high)
+            high = max(low, high * 2 // 3)
+        iteration_options.append(low)
+        self.levels = sorted(((i, s) for i in iteration_options for s in range(substeps[0], substeps[1] + 1)),
+                             key=lambda level: (-level[1], -level[0]))
+        # Start where the game always used to run: most iterations, fewest substeps
+        self.level = self.levels.index((iterations[1], substeps[0]))
+
+        self.total_ms = 0.0
+        self.steps = 0
+        # Grain count when quality last had to drop; don't raise it again until there are fewer
+        self.overload_grains = None
+
+    @property
+    def iterations(self):
+        return self.levels[self.level][0]
+
+    @property
+    def substeps(self):
+        return self.levels[self.level][1]
+
+    def observe(self, step_ms, live_grains):
+        """
+        Record how long a physics step took, and change the quality level if needed.
+
+        :param step_ms: Milliseconds the last physics step took.
+        :param live_grains: Number of grains being simulated.
+        :return: True if the quality level changed.
+        """
+        self.total_ms += step_ms
+        self.steps += 1
+        if self.steps < self.interval:
+            return False
+        average = self.total_ms / self.steps
+        self.total_ms = 0.0
+        self.steps = 0
+
+        if average > self.target_ms and self.level < len(self.levels) - 1:
+            # Too slow, give up some accuracy
+            self.level += 1
+            self.overload_grains = live_grains
+            return True
+        if average < self.target_ms * 0.5 and self.level > 0 \
+                and (self.overload_grains is None or live_grains < self.overload_grains or average < self.target_ms * 0.25):
+            # Plenty of headroom, and fewer grains than when it was too slow
+            # (or so much headroom it doesn't matter), be more accurate
+            self.level -= 1
+            return True
+        return False
+
+    def apply(self, space):
+        """
+        Set the space's solver iterations for the current quality level.
+        """
+        space.iterations = self.iterations
+
+    def report(self, profiler):
+        """
+        Send the current quality level to the profiler.
+        """
+        profiler.gauge('quality.level', self.level)
+        profiler.gauge('solver.iterations', self.iterations)
+        profiler.gauge('substeps', self.substeps)
@@ -0,0 +1,233 @@
+#############################################################
+# Module Name: Sugar Pop Replay Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Records the inputs of a game session and plays them back
+#############################################################
+import argparse
+import os
+import struct
+import time
+from settings import *
+from profiler import PhaseProfiler
+
+REPLAY_MAGIC = b'SPRP'
+REPLAY_VERSION = 1
+HEADER = struct.Struct('<4sBd')  # Magic, version, physics time step
+RECORD = struct.Struct('<IB')  # Physics step the input happened after, event kind
+
+# Event kinds and the layout of what follows each of them
+LEVEL, LINE_BEGIN, LINE_VERTEX, LINE_END, GRAVITY, PAUSE, QUALITY, END = range(8)
+EVENT_NAMES = ('level', 'line_begin', 'line_vertex', 'line_end', 'gravity', 'pause', 'quality', 'end')
+PAYLOADS = {
+    LINE_BEGIN: struct.Struct('<hh'),  # Mouse x, y in pixels
+    LINE_VERTEX: struct.Struct('<hh'),
+    LINE_END: struct.Struct(''),
+    GRAVITY: struct.Struct('<b'),  # 1 down, -1 up
+    PAUSE: struct.Struct('<?'),
+    QUALITY: struct.Struct('<BB'),  # Solver iterations, substeps
+    END: struct.Struct(''),
+}
+LEVEL_NAME = struct.Struct('<H')  # Length of the level file name that follows
+
+
+class ReplayRecorder:
+    """
+    Writes every input the simulation receives to a replay file, stamped with
+    the number of physics steps run before it. The file is only ever appended
+    to, so a crash loses nothing but the last unflushed events.
+    """
+    def __init__(self, path, time_step=PHYSICS_TIME_STEP):
+        """
+        Start a new replay file.
+
+        :param path: File to write.
+        :param time_step: Simulated seconds per physics step of the recorded session.
+        """
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, time_step))
+        self.last_step = 0
+        self.events = 0
+
+    def write(self, step, kind, *values):
+        """
+        Append one event.
+
+        :param step: Physics steps run so far (Simulation.total_steps).
+        :param kind: One of the event kinds, e.g. LINE_BEGIN.
+        :param values: The values of the event, see PAYLOADS. LEVEL takes the level file name.
+        """
+        if kind == LEVEL:
+            name = values[0].encode('utf-8')
+            payload = LEVEL_NAME.pack(len(name)) + name
+        else:
+            payload = PAYLOADS[kind].pack(*values)
+        self.file.write(RECORD.pack(step, kind) + payload)
+        self.last_step = step
+        self.events += 1
+        if kind in (LEVEL, LINE_END, END):
+            self.file.flush()
+
+    def close(self, step=None):
+        """
+        Mark the end of the session and close the file.
+
+        :param step: Physics steps run in the whole session.
+        """
+        if self.file.closed:
+            return
+        self.write(self.last_step if step is None else step, END)
+        self.file.close()
+
+
+def read_replay(path):
+    """
+    Read a replay file.
+
+    :param path: File written by a ReplayRecorder.
+    :return: The physics time step and the list of (step, kind, values) events.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, time_step = HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay file")
+    events = []
+    offset = HEADER.size
+    while offset + RECORD.size <= len(data):
+        step, kind = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if kind == LEVEL:
+            length, = LEVEL_NAME.unpack_from(data, offset)
+            offset += LEVEL_NAME.size
+            values = (data[offset:offset + length].decode('utf-8'),)
+            offset += length
+        else:
+            payload = PAYLOADS[kind]
+            if offset + payload.size > len(data):
+                break  # Cut short by a crash, keep what is there
+            values = payload.unpack_from(data, offset)
+            offset += payload.size
+        events.append((step, kind, values))
+    return time_step, events
+
+
+class ReplayPlayer:
+    """
+    Feeds the events of a replay back into a Simulation at the same physics
+    steps they were recorded at. The simulation calls apply() before every step.
+    """
+    def __init__(self, path):
+        """
+        Load a replay.
+
+        :param path: File written by a ReplayRecorder.
+        """
+        self.time_step, self.events = read_replay(path)
+        self.next = 0  # Index of the next event to apply
+        # Sessions that crashed have no END event, run them to their last input
+        self.end_step = self.events[-1][0] if self.events else 0
+
+    @property
+    def done(self):
+        return self.next >= len(self.events)
+
+    def apply(self, sim):
+        """
+        Apply every event due by the simulation's current step.
+        """
+        while self.next < len(self.events) and self.events[self.next][0] <= sim.total_steps:
+            step, kind, values = self.events[self.next]
+            self.next += 1
+            if kind == LEVEL:
+                sim.load_level(values[0])
+            elif kind == LINE_BEGIN:
+                sim.begin_line(*values)
+            elif kind == LINE_VERTEX:
+                sim.extend_line(*values)
+            elif kind == LINE_END:
+                sim.end_line()
+            elif kind == GRAVITY:
+                sim.set_gravity(values[0])
+            elif kind == PAUSE:
+                pass  # No steps ran while the session was paused, so there is nothing to redo
+            elif kind == QUALITY:
+                sim.set_quality(*values)
+
+
+def play(path, profiler=None):
+    """
+    Re-run a recorded session headless, as fast as the CPU allows.
+
+    :param path: Replay file to play.
+    :param profiler: PhaseProfiler that times the physics phases, or None.
+    :return: Dictionary with the results of the run.
+    """
+    from simulation import Simulation
+    player = ReplayPlayer(path)
+    # The recorded quality changes are replayed, so the controller stays off
+    sim = Simulation(time_step=player.time_step, profiler=profiler, adaptive=False)
+    sim.player = player
+    start = time.perf_counter()
+    while sim.total_steps < player.end_step:
+        sim.step()
+    player.apply(sim)  # Inputs after the last step
+    wall_time = time.perf_counter() - start
+    return {
+        "replay": path,
+        "level": sim.level.level_file if sim.level else None,
+        "events": len(player.events),
+        "frames": sim.total_steps,
+        "wall_seconds": wall_time,
+        "fps": sim.total_steps / wall_time if wall_time > 0 else float('inf'),
+        "grains": len(sim.sugar_grains),
+        "bucket_counts": [bucket.count for bucket in sim.buckets],
+        "checksum": float(sim.sugar_grains.positions.sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play back a recorded sugar pop session")
+    parser.add_argument("replay", help="Replay file written with main.py --record")
+    parser.add_argument("--render", action="store_true", help="Show the game while it plays instead of running headless")
+    parser.add_argument("--events", action="store_true", help="List the recorded events")
+    parser.add_argument("--metrics", metavar="FILE", help="Write the phase timings to FILE (.json or .csv)")
+    args = parser.parse_args()
+    if not args.render:
+        # Headless playback needs no window or sound card
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    if args.events:
+        time_step, events = read_replay(args.replay)
+        print(f"Physics rate: {1.0 / time_step:.0f} steps/s")
+        for step, kind, values in events:
+            print(f"{step:>8} {EVENT_NAMES[kind]:<12} {' '.join(str(v) for v in values)}")
+        return
+
+    profiler = PhaseProfiler(enabled=bool(args.metrics))
+    if args.render:
+        import main as game
+        try:
+            game.Game(profiler, replay_file=args.replay).run()
+        finally:
+            if args.metrics:
+                profiler.dump(args.metrics)
+        return
+
+    results = play(args.replay, profiler)
+    print(f"Replay:         {results['replay']} ({results['events']} events)")
+    print(f"Level:          {results['level']}")
+    print(f"Frames:         {results['frames']}")
+    print(f"Wall time:      {results['wall_seconds']:.2f} s ({results['fps']:.0f} frames/s)")
+    print(f"Grains:         {results['grains']}")
+    print(f"Bucket counts:  {results['bucket_counts']}")
+    print(f"Checksum:       {results['checksum']:.6f}")
+    if args.metrics:
+        profiler.dump(args.metrics)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,18 +14,97 @@ FPS = 60
 
 # Scaling factor (Pixels per meter)
 SCALE = 30  # Scale Factor: 30 pixels per meter
-MAX_TIME_STEP = 1.0 / FPS  # Simulation step
+
+# Physics runs at its own fixed rate, independent of the render FPS
+PHYSICS_RATE = 60  # Physics steps per simulated second
+PHYSICS_TIME_STEP = 1.0 / PHYSICS_RATE
+MAX_STEPS_PER_FRAME = 8  # Simulated time beyond this is dropped so a slow frame can't spiral
+BUCKET_CHECK_INTERVAL = 1.0 / 3  # Simulated seconds between bucket counts
+SEED_SPOUT_JITTER = 1.0  # Pixels the spout wanders in seeded (batch) runs
+GRAVITY = 9  # Meters/second^2
+
+# The spout. Levels can override these with spout_rate, spout_burst, spout_jitter and spout_speed
+SPOUT_FLOW_RATE = 3.0  # Grains per second of simulated time
+SPOUT_BURST = 1  # Grains made together in one batch
+SPOUT_JITTER = 0.3  # Pixels each grain of a burst may move off its grid place
+SPOUT_SPEED = 0.0  # Meters/second the grains leave the spout with
+
+# Asset loading: 'background' decodes images and sounds on a thread while the intro
+# shows, 'blocking' decodes them all before the first frame
+ASSET_LOADING = 'background'
+
+# Audio
+AUDIO_CHANNELS = 8  # Mixer channels the game may use
+SOUND_MIN_INTERVAL = 0.05  # Seconds between two plays of the same sound, events in between are merged
+
+# Grain physics: 'box' (rotating squares), 'circle' (round grains that never turn, cheaper
+# contacts) or 'particle' (a NumPy solver for very large grain counts, see particle_pool.py)
+GRAIN_SHAPE = 'box'
+PARTICLE_ITERATIONS = 4  # Constraint passes per step of the particle solver
+
+# Grain drawing: 'blits', 'pixels' or 'per_object' (one draw call per grain)
+GRAIN_RENDER_MODE = 'blits'
+# Screen updates: 'dirty' redraws and pushes only the parts of the screen that changed,
+# 'full' redraws and pushes the whole screen every frame
+RENDER_PATH = 'dirty'
+DIRTY_TILE_SIZE = 32  # Pixels per side of the tiles the dirty screen areas are rounded to
 
 # Define collision types
 FLOOR_COLLISION_TYPE = 1
-BOX_COLLISION_TYPE = 2
+BOX_COLLISION_TYPE = 2  # The sensor inside every bucket
+GRAIN_COLLISION_TYPE = 3
+
+# Collision category bits, so space queries can pick out just the grains
+GRAIN_CATEGORY = 0b10
+BUCKET_SENSOR_CATEGORY = 0b100
+
+# Bucket counting: 'sensor' keeps counts up to date every step from collision events,
+# 'poll' tests every grain against every bucket each BUCKET_CHECK_INTERVAL
+BUCKET_COUNT_MODE = 'sensor'
+
+
+# Settled grains. Bodies at rest longer than the sleep threshold stop costing the solver
+SLEEP_TIME_THRESHOLD = 0.5  # Seconds a grain must be idle before it sleeps
+IDLE_SPEED_THRESHOLD = 0.05  # Speed (meters/second) below which a grain counts as idle
+FREEZE_SETTLED_GRAINS = False  # Turn long-settled piles in buckets into a static fill
+FREEZE_AFTER = 2.0  # Seconds every grain in a bucket must be asleep before it is frozen
+
+# Grain lifecycle
+MAX_LIVE_GRAINS = 5000  # Grains simulated at once, the oldest stray grains are recycled past this
+DESPAWN_MARGIN = 50  # Pixels a grain may go past the screen edge before it is despawned
+
+# Broadphase: 'tree' is Pymunk's default bounding box tree, 'hash' a spatial hash,
+# which can be faster with thousands of grains. Levels can pick their own with a "broadphase" key
+BROADPHASE = 'tree'
+SPATIAL_HASH_CELL = 2.0  # Hash cell size, in grain sizes
+SPATIAL_HASH_CELLS_PER_GRAIN = 10  # Hash table cells per grain the level can hold
+
+# Threads for the Pymunk solver. 1 is the plain single threaded space; more uses
+# Pymunk's threaded space (not on Windows, and Pymunk uses at most 2)
+PHYSICS_THREADS = 1
+
+# Adaptive physics quality: solver iterations and substeps follow the measured step time
+ADAPTIVE_QUALITY = True
+TARGET_STEP_MS = 4.0  # Milliseconds a physics step should take
+SOLVER_ITERATIONS_MIN = 8
+SOLVER_ITERATIONS_MAX = 30
+SUBSTEPS_MIN = 1
+SUBSTEPS_MAX = 2
+QUALITY_ADJUST_STEPS = 30  # Physics steps between quality changes
 
+# User drawn lines
+LINE_SIMPLIFY_TOLERANCE = 2  # Pixels a drawn line may stray from the mouse path to save segments
+MAX_SEGMENTS_PER_LINE = 50  # Collision segments allowed in one drawn line
+MAX_SEGMENTS_PER_LEVEL = 300  # Collision segments allowed in all drawn lines of a level
 
 # Level Info
 LEVEL_FILE_NAME = './levels/levelX.json'
+LEVEL_CACHE_SIZE = 8  # Parsed levels kept in memory
+FLOW_START_DELAY = 5  # Seconds of simulated time before the spout starts
+EDITOR_GRID = 10  # Pixels the level editor snaps points to
+EDITOR_BUCKET_SUGAR = 20  # Grains a new bucket needs, +/- in the editor changes it
 
 # User Defined Events
-START_FLOW = pg.USEREVENT + 1
 FLOW_DELAY = pg.USEREVENT + 2
 LOAD_NEW_LEVEL = pg.USEREVENT + 3
 EXIT_APP = pg.USEREVENT + 4
\ No newline at end of file
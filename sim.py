@@ -0,0 +1,113 @@
+#############################################################
+# Module Name: Sugar Pop Headless Simulation Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Runs sugar pop levels without a display, sound or frame pacing
+#############################################################
+import argparse
+import os
+import sys
+import time
+from settings import *
+from simulation import Simulation
+from grain_pool import GRAIN_SHAPES
+from profiler import PhaseProfiler
+
+
+def resolve_level(name):
+    """
+    Find a level file, either as given or inside the levels folder.
+    """
+    if os.path.exists(name):
+        return name
+    return os.path.join(os.path.dirname(LEVEL_FILE_NAME), name)
+
+
+def run_level(level_file, frames, time_step=PHYSICS_TIME_STEP, stop_when_complete=True, seed=None, profiler=None,
+              adaptive=False, threads=1, grain_shape=GRAIN_SHAPE):
+    """
+    Simulate a level as fast as the CPU allows with a fixed time step.
+
+    :param level_file: Path to the JSON file for the level.
+    :param frames: Maximum number of physics steps to run.
+    :param time_step: Simulated seconds per step.
+    :param stop_when_complete: Stop early once every bucket has exploded.
+    :param seed: Random seed for the spout, or None for the exact spout position.
+    :param profiler: PhaseProfiler that times the physics phases, or None.
+    :param adaptive: Let the solver quality follow the load. Off by default so runs are repeatable.
+    :param threads: Solver threads, more than 1 uses Pymunk's threaded space.
+    :param grain_shape: 'box', 'circle' or 'particle', see GRAIN_SHAPE.
+    :return: Dictionary with the results of the run, or None if the level was not found.
+    """
+    sim = Simulation(time_step=time_step, seed=seed, profiler=profiler, adaptive=adaptive, threads=threads,
+                     grain_shape=grain_shape)
+    if not sim.load_level(level_file):
+        return None
+
+    start = time.perf_counter()
+    steps = 0
+    while steps < frames:
+        sim.step()
+        steps += 1
+        if stop_when_complete and sim.level_complete:
+            break
+    wall_time = time.perf_counter() - start
+
+    return {
+        "level": level_file,
+        "seed": seed,
+        "frames": steps,
+        "simulated_seconds": sim.level_time,
+        "wall_seconds": wall_time,
+        "fps": steps / wall_time if wall_time > 0 else float('inf'),
+        "grains_spawned": sim.grains_spawned,
+        "bucket_counts": [bucket.count for bucket in sim.buckets],
+        "buckets_exploded": sum(bucket.exploded for bucket in sim.buckets),
+        "completed": sim.level_complete,
+        "solver_iterations": sim.space.iterations,
+        "substeps": sim.substeps,
+        "grain_shape": sim.grain_shape,
+    }
+
+
+def print_results(results):
+    """
+    Print the results of a run in a readable form.
+    """
+    print(f"Level:            {results['level']}")
+    print(f"Frames:           {results['frames']} ({results['simulated_seconds']:.1f} s simulated)")
+    print(f"Wall time:        {results['wall_seconds']:.2f} s")
+    print(f"Frames/second:    {results['fps']:.1f}")
+    print(f"Grains spawned:   {results['grains_spawned']}")
+    print(f"Bucket counts:    {results['bucket_counts']}")
+    print(f"Buckets exploded: {results['buckets_exploded']}/{len(results['bucket_counts'])}")
+    print(f"Completed:        {'yes' if results['completed'] else 'no'}")
+    print(f"Solver quality:   {results['solver_iterations']} iterations x {results['substeps']} substeps")
+    print(f"Grain shape:      {results['grain_shape']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a sugar pop level without a display")
+    parser.add_argument("level", help="Level file, e.g. level3.json or ./levels/level3.json")
+    parser.add_argument("--frames", type=int, default=PHYSICS_RATE * 120, help="Maximum number of physics steps")
+    parser.add_argument("--rate", type=float, default=PHYSICS_RATE, help="Physics steps per simulated second")
+    parser.add_argument("--keep-going", action="store_true", help="Run all frames even after the level is complete")
+    parser.add_argument("--threads", type=int, default=1, help="Physics solver threads")
+    parser.add_argument("--grain-shape", choices=GRAIN_SHAPES, default=GRAIN_SHAPE, help="How the grains are simulated")
+    parser.add_argument("--adaptive", action="store_true", help="Let solver iterations and substeps follow the load")
+    parser.add_argument("--metrics", metavar="FILE", help="Write the per-phase percentiles to FILE (.json or .csv)")
+    args = parser.parse_args()
+
+    profiler = PhaseProfiler(enabled=bool(args.metrics), window=args.frames)
+    results = run_level(resolve_level(args.level), args.frames, 1.0 / args.rate, not args.keep_going, profiler=profiler,
+                        adaptive=args.adaptive, threads=args.threads, grain_shape=args.grain_shape)
+    if results is None:
+        sys.exit(1)
+    print_results(results)
+    if args.metrics:
+        profiler.dump(args.metrics)
+
+
+if __name__ == '__main__':
+    main()
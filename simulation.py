@@ -0,0 +1,513 @@
+#############################################################
+# Module Name: Sugar Pop Simulation Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: The physics side of the sugar pop game, without any drawing
+#############################################################
+import random
+import time
+import numpy as np
+import pymunk
+from settings import *
+import static_item
+import bucket
+import bucket_counter
+import level_cache
+import dynamic_item
+import replay
+from emitter import Emitter
+from grain_pool import GrainPool, GRAIN_SIZE, GRAIN_SHAPES
+from particle_pool import ParticlePool
+from profiler import PhaseProfiler
+from quality_controller import QualityController
+
+
+class Simulation:
+    def __init__(self, sound=None, time_step=PHYSICS_TIME_STEP, seed=None, profiler=None, adaptive=ADAPTIVE_QUALITY,
+                 count_mode=BUCKET_COUNT_MODE, threads=PHYSICS_THREADS, grain_shape=GRAIN_SHAPE):
+        """
+        Initialize the simulation with an empty Pymunk space.
+
+        :param sound: The Sound used by the buckets, or None to run silently.
+        :param time_step: Fixed simulated seconds per physics step.
+        :param seed: Random seed that jitters the spout, or None for the exact spout position.
+        :param profiler: PhaseProfiler that times the physics phases, or None to not time them.
+        :param adaptive: Let a QualityController change the solver iterations and substeps
+                         with the load. Turn off for runs that must be repeatable.
+        :param count_mode: 'sensor' to count bucket grains from collision events, 'poll' to test every grain.
+        :param threads: Solver threads. Results are only repeatable with 1.
+        :param grain_shape: 'box', 'circle' or 'particle', see GRAIN_SHAPE.
+        """
+        if count_mode not in bucket_counter.COUNT_MODES:
+            raise ValueError(f"Unknown bucket count mode: {count_mode}")
+        if grain_shape not in GRAIN_SHAPES:
+            raise ValueError(f"Unknown grain shape: {grain_shape}")
+        self.grain_shape = grain_shape
+        if grain_shape == 'particle':
+            count_mode = 'poll'  # Particles have no shapes for the sensors to see
+        self.profiler = profiler or PhaseProfiler(enabled=False)
+        self.sound = sound
+        self.seed = seed
+        # Unseeded runs still jitter the spout bursts the same way every time, so replays repeat
+        self.random = random.Random(0 if seed is None else seed)
+        self.time_step = time_step
+        # Periodic work is scheduled in steps so it only depends on simulated time
+        self.bucket_check_steps = max(1, round(BUCKET_CHECK_INTERVAL / time_step))
+        self.accumulator = 0.0  # Frame time not yet simulated
+        self.substeps = 1
+        self.quality = QualityController() if adaptive else None
+        self.count_mode = count_mode
+        self.threads = threads
+        self.broadphase = 'tree'
+        self.space = None
+        self.new_space()
+        if self.quality:
+            self.quality.report(self.profiler)
+        self.freeze_settled = FREEZE_SETTLED_GRAINS
+
+        self.step_count = 0  # Physics steps since the level was loaded
+        self.total_steps = 0  # Physics steps since the simulation was created
+        self.level = None
+        self.level_time = 0.0  # Simulated seconds since the level was loaded
+        self.level_complete = False
+        # Bumped whenever static geometry changes, so cached drawings know to redraw
+        self.geometry_version = 0
+        self.drawing_lines = []
+        if grain_shape == 'particle':
+            self.sugar_grains = ParticlePool(self.space, friction=0.1)
+        else:
+            self.sugar_grains = GrainPool(self.space, friction=0.1, shape=grain_shape)
+        self.buckets = []
+        self.statics = []
+        self.total_sugar_count = None
+        self.grains_spawned = 0  # Grains that came out of the spout this level, frozen or not
+        self.grains_despawned = 0  # Grains removed for leaving the play area or for the live cap
+        self.max_live_grains = MAX_LIVE_GRAINS
+        # Grains past this rectangle (Pymunk units) have left the play area
+        margin = DESPAWN_MARGIN / SCALE
+        self.play_area = (-margin, -margin, WIDTH / SCALE + margin, HEIGHT / SCALE + margin)
+        self.level_spout_position = None
+        self.emitter = None
+        self.level_grain_dropping = False
+        # Called once when the last bucket of the level explodes
+        self.on_level_complete = None
+        self.current_line = None  # Line the user is drawing
+        self.paused = False
+        self.recorder = None  # ReplayRecorder the inputs are written to
+        self.player = None  # ReplayPlayer the inputs come from
+
+    def new_space(self):
+        """
+        Create an empty Pymunk space with the game's settings, keeping the
+        solver iterations and gravity of the current one if there is one.
+        """
+        old_space = self.space
+        if self.threads > 1:
+            self.space = pymunk.Space(threaded=True)
+            self.space.threads = self.threads
+        else:
+            self.space = pymunk.Space()
+        self.space.gravity = (0, -GRAVITY)  # Gravity pointing downwards in Pymunk's coordinate system
+        # Iterations defaults to 10. Higher is more accurate collison detection
+        self.space.iterations = 30
+        if old_space is not None:
+            self.space.gravity = old_space.gravity
+            self.space.iterations = old_space.iterations
+        elif self.quality:
+            self.quality.apply(self.space)
+            self.substeps = self.quality.substeps
+        # Let grains that came to rest sleep so the solver skips them
+        self.space.sleep_time_threshold = SLEEP_TIME_THRESHOLD
+        self.space.idle_speed_threshold = IDLE_SPEED_THRESHOLD
+        self.sensors = bucket_counter.BucketSensors(self.space) if self.count_mode == 'sensor' else None
+        self.broadphase = 'tree'
+
+    def set_broadphase(self, broadphase, grain_count):
+        """
+        Pick the space's spatial index for a level. Call while the space is empty.
+
+        :param broadphase: 'tree' for the bounding box tree, 'hash' for a spatial hash.
+        :param grain_count: Grains the level will hold, to size the hash table.
+        """
+        if broadphase not in ('tree', 'hash'):
+            raise ValueError(f"Unknown broadphase: {broadphase}")
+        if broadphase == 'hash':
+            self.space.use_spatial_hash(GRAIN_SIZE * SPATIAL_HASH_CELL, max(1000, grain_count * SPATIAL_HASH_CELLS_PER_GRAIN))
+            self.broadphase = 'hash'
+        elif self.broadphase != 'tree':
+            # Pymunk can't switch a space back to the tree, so start a new one
+            self.new_space()
+            self.sugar_grains.space = self.space
+
+    def clear(self):
+        """
+        Destroy any current game objects.
+        """
+        self.sugar_grains.clear()  # Delete all sugar grains
+        for item in self.drawing_lines:
+            item.delete()
+        for item in self.buckets:
+            item.delete()
+        for item in self.statics:
+            item.delete()
+        self.drawing_lines = []  # Clear the list
+        self.current_line = None
+        self.buckets = []
+        if self.sensors:
+            self.sensors.clear()
+        self.statics = []
+        self.level_spout_position = None
+        self.emitter = None
+        self.geometry_version += 1
+
+    def load_level(self, level_file):
+        """
+        Load a level file and build its walls, buckets and statics.
+
+        :param level_file: Path to the JSON file for the level.
+        :return: True if the level was loaded, False if it was not found.
+        """
+        self.record(replay.LEVEL, level_file)
+        self.clear()
+        self.level = level_cache.levels.get(level_file)
+
+        # Make sure the file was found
+        if not self.level or not self.level.data:
+            return False
+
+        self.step_count = 0
+        self.accumulator = 0.0
+        self.level_time = 0.0
+        self.grains_spawned = 0
+        self.grains_despawned = 0
+        self.level_grain_dropping = False
+        self.level_spout_position = (self.level.data['spout_x'], self.level.data['spout_y'])
+        self.emitter = Emitter.from_level(self.level.data, self.random)
+        self.total_sugar_count = self.level.data['number_sugar_grains']
+        self.set_broadphase(self.level.data.get('broadphase', BROADPHASE), min(self.total_sugar_count, self.max_live_grains))
+        self.build_main_walls()
+
+        # Load buckets
+        for nb in self.level.data['buckets']:
+            self.buckets.append(bucket.Bucket(self.space, nb['x'], nb['y'], nb['width'], nb['height'], nb['needed_sugar'], self.sound,
+                                              sensor=self.sensors is not None, aabb=nb.get('aabb')))
+            if self.sensors:
+                self.sensors.add(self.buckets[-1])
+        # Load static items
+        for nb in self.level.data['statics']:
+            self.statics.append(static_item.StaticItem(self.space, nb['x1'], nb['y1'], nb['x2'], nb['y2'], nb['color'], nb['line_width'], nb['friction'], nb['restitution']))
+
+        self.level_complete = False
+        self.geometry_version += 1
+        return True
+
+    def build_main_walls(self):
+        '''Build the walls, ceiling, and floor of the screen'''
+        # Floor
+        floor = static_item.StaticItem(self.space, 0, 0, WIDTH, 0, 'red', 5)
+        self.statics.append(floor)
+        # Left Wall
+        left_wall = static_item.StaticItem(self.space, 0, 0, 0, HEIGHT, 'red')
+        self.statics.append(left_wall)
+        # Right Wall
+        right_wall = static_item.StaticItem(self.space, WIDTH, 0, WIDTH, HEIGHT, 'red')
+        self.statics.append(right_wall)
+        # Ceiling
+        ceiling = static_item.StaticItem(self.space, 0, HEIGHT, WIDTH, HEIGHT, 'red')
+        self.statics.append(ceiling)
+
+    def check_all_buckets_exploded(self):
+        """
+        Check if all buckets have exploded.
+        """
+        return all(bucket.exploded for bucket in self.buckets)
+
+    def line_budget(self):
+        """
+        Number of segments the next user-drawn line may use, within the
+        per-line and per-level budgets.
+        """
+        used = sum(len(line.segments) for line in self.drawing_lines)
+        return max(0, min(MAX_SEGMENTS_PER_LINE, MAX_SEGMENTS_PER_LEVEL - used))
+
+    def add_line(self, line):
+        """
+        Keep a finished user-drawn line as part of the level.
+
+        :param line: The DynamicItem the user drew.
+        """
+        line.finish()
+        self.drawing_lines.append(line)
+        self.geometry_version += 1
+
+    def record(self, kind, *values):
+        """
+        Write an input to the replay being recorded, if any.
+        """
+        if self.recorder:
+            self.recorder.write(self.total_steps, kind, *values)
+
+    def start_recording(self, recorder):
+        """
+        Record every input from now on.
+
+        :param recorder: The ReplayRecorder to write to.
+        """
+        self.recorder = recorder
+        self.record(replay.QUALITY, self.space.iterations, self.substeps)
+
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close(self.total_steps)
+            self.recorder = None
+
+    def begin_line(self, x, y):
+        """
+        Start a user-drawn line at a mouse position.
+        """
+        self.record(replay.LINE_BEGIN, x, y)
+        self.current_line = dynamic_item.DynamicItem(self.space, 'blue', max_segments=self.line_budget())
+        self.current_line.add_vertex(x, y)
+
+    def extend_line(self, x, y):
+        """
+        Add a mouse position to the line being drawn.
+        """
+        if self.current_line:
+            self.record(replay.LINE_VERTEX, x, y)
+            self.current_line.add_vertex(x, y)
+
+    def end_line(self):
+        """
+        Finish the line being drawn and keep it in the level.
+        """
+        if self.current_line:
+            self.record(replay.LINE_END)
+            self.add_line(self.current_line)
+            self.current_line = None
+
+    def set_paused(self, paused):
+        """
+        Stop or restart the physics.
+        """
+        self.record(replay.PAUSE, paused)
+        self.paused = paused
+
+    def set_quality(self, iterations, substeps):
+        """
+        Set the solver iterations and substeps, as a replay does with the ones it recorded.
+        """
+        self.space.iterations = iterations
+        self.substeps = substeps
+
+    def set_gravity(self, direction):
+        """
+        Point gravity down (1) or up (-1).
+        """
+        self.record(replay.GRAVITY, direction)
+        self.space.gravity = (0, -GRAVITY * direction)
+        # Sleeping grains don't notice gravity changing, so wake everything up
+        self.thaw_all()
+        self.sugar_grains.wake()
+
+    def advance(self, frame_time):
+        """
+        Run as many fixed physics steps as fit in the time since the last frame.
+
+        :param frame_time: Real seconds since the last rendered frame.
+        :return: How far the leftover time is into the next step (0 to 1), for interpolation.
+        """
+        if self.paused:
+            return self.accumulator / self.time_step
+        self.accumulator += frame_time
+        steps = 0
+        while self.accumulator >= self.time_step and steps < MAX_STEPS_PER_FRAME:
+            self.step()
+            self.accumulator -= self.time_step
+            steps += 1
+        if steps == MAX_STEPS_PER_FRAME:
+            # Too far behind, drop the rest rather than falling further back
+            self.accumulator = min(self.accumulator, self.time_step)
+        return self.accumulator / self.time_step
+
+    def step(self):
+        """
+        Advance the simulation by one fixed physics step.
+        """
+        if self.player:
+            self.player.apply(self)  # Recorded inputs that happened before this step
+        self.step_count += 1
+        self.total_steps += 1
+
+        # Remember where the grains were so drawing can interpolate
+        self.sugar_grains.save_previous()
+        start = time.perf_counter()
+        for _ in range(self.substeps):
+            self.space.step(self.time_step / self.substeps)
+            if self.grain_shape == 'particle':
+                self.sugar_grains.step(self.time_step / self.substeps, self.space.gravity)
+        step_ms = (time.perf_counter() - start) * 1000.0
+        self.profiler.record('space.step', step_ms)
+        if self.quality and self.quality.observe(step_ms, len(self.sugar_grains)):
+            self.quality.apply(self.space)
+            self.substeps = self.quality.substeps
+            self.quality.report(self.profiler)
+            self.record(replay.QUALITY, self.space.iterations, self.substeps)
+        self.level_time += self.time_step
+        # Read back where every grain ended up
+        with self.profiler.phase('grain.sync'):
+            self.sugar_grains.sync()
+
+        # Start the spout once the level has been shown for a while
+        if self.level and not self.level_grain_dropping and self.level_time >= FLOW_START_DELAY \
+                and self.grains_spawned < self.total_sugar_count:
+            self.level_grain_dropping = True
+
+        if self.step_count % self.bucket_check_steps == 0:
+            with self.profiler.phase('grain.cull'):
+                self.cull_grains()
+            with self.profiler.phase('bucket.count'):
+                self.update_buckets()
+        elif self.sensors:
+            # Sensor counts change every step, so a bucket can go off as soon as it is full
+            self.explode_full_buckets()
+        if self.level_grain_dropping:
+            with self.profiler.phase('grain.spawn'):
+                self.update_spout()
+
+    def cull_grains(self):
+        """
+        Despawn the grains that got out of the play area, e.g. blown through a wall by an explosion.
+        """
+        grains = self.sugar_grains
+        if len(grains):
+            self.grains_despawned += grains.delete(grains.outside(*self.play_area))
+        self.profiler.gauge('grains.live', len(grains))
+        self.profiler.gauge('grains.free', len(grains.free))
+
+    def recycle_stray_grains(self, count):
+        """
+        Despawn the oldest grains that are not in a bucket, to make room under the live grain cap.
+
+        :param count: Number of grains to make room for.
+        :return: Number of grains despawned, fewer than count if the rest are all in buckets.
+        """
+        grains = self.sugar_grains
+        live = [bucket for bucket in self.buckets if not bucket.exploded]
+        stray = ~bucket_counter.inside_mask(grains.positions, bucket_counter.bucket_bounds(live)).any(axis=0) \
+            if live else np.ones(len(grains), dtype=bool)
+        # Grains are kept in spawn order, so the first stray ones are the oldest
+        removed = grains.delete(np.flatnonzero(stray)[:count])
+        self.grains_despawned += removed
+        return removed
+
+    def update_buckets(self):
+        """
+        Explode the full buckets and count the grains in the others.
+        """
+        self.explode_full_buckets()
+        if not self.sensors:
+            # Polling: count each grain's position again from scratch
+            for bucket in self.buckets:
+                bucket.count_reset()
+            bucket_counter.count_grains(self.buckets, self.sugar_grains.positions, self.sugar_grains.played)
+        if self.freeze_settled:
+            self.freeze_settled_buckets()
+
+    def explode_full_buckets(self):
+        """
+        Explode every bucket holding its needed sugar, and finish the level when none are left.
+        """
+        for bucket in self.buckets:
+            if bucket.count >= bucket.needed_sugar:
+                if not bucket.exploded:
+                    self.thaw(bucket)
+                    bucket.explode()
+                    if self.grain_shape == 'particle':
+                        self.sugar_grains.blast(bucket.center())
+                    self.geometry_version += 1
+                # If all the buckets are gone, level up!
+                if not self.level_complete and self.check_all_buckets_exploded():
+                    self.level_complete = True
+                    if self.on_level_complete:
+                        self.on_level_complete()
+
+    def freeze_settled_buckets(self):
+        """
+        Freeze the pile in any bucket whose grains have all been asleep for FREEZE_AFTER seconds.
+        """
+        grains = self.sugar_grains
+        if not len(grains):
+            return
+        interval = self.bucket_check_steps * self.time_step
+        live = [bucket for bucket in self.buckets if not bucket.exploded]
+        if not live:
+            return
+        inside = bucket_counter.inside_mask(grains.positions, bucket_counter.bucket_bounds(live))
+        for bucket, in_bucket in zip(live, inside):
+            indices = np.flatnonzero(in_bucket)
+            if len(indices) and grains.asleep(indices):
+                bucket.settled_time += interval
+            else:
+                bucket.settled_time = 0.0
+            if bucket.settled_time >= FREEZE_AFTER:
+                bucket.freeze(grains.positions[indices])
+                grains.delete(indices)
+                bucket.settled_time = 0.0
+                self.geometry_version += 1  # The fill is drawn with the static geometry
+                # The other buckets' masks refer to the old grain order
+                return
+
+    def thaw(self, bucket):
+        """
+        Put the frozen grains of a bucket back as live bodies, stacked inside the bucket.
+        """
+        count, _ = bucket.thaw()
+        if not count:
+            return
+        self.geometry_version += 1
+        left, right, bottom = bucket.interior()
+        spacing = GRAIN_SIZE * 1.05
+        columns = max(1, int((right - left) / spacing))
+        points = [((left + spacing * (0.5 + i % columns)) * SCALE, (bottom + spacing * (0.5 + i // columns)) * SCALE)
+                  for i in range(count)]
+        start = self.sugar_grains.spawn(points)
+        self.sugar_grains.played[start:] = True  # These already played their sound
+        if self.sensors:
+            self.sensors.played.update(self.sugar_grains.shapes[start:])
+
+    def thaw_all(self):
+        """
+        Put the frozen grains of every bucket back as live bodies.
+        """
+        for bucket in self.buckets:
+            if not bucket.exploded:
+                self.thaw(bucket)
+
+    def update_spout(self):
+        """
+        Pour the grains the emitter asks for this step, if any.
+        """
+        count = self.emitter.update(self.time_step, self.total_sugar_count - self.grains_spawned)
+        if not count:
+            return
+        room = self.max_live_grains - len(self.sugar_grains)
+        if room < count:
+            room += self.recycle_stray_grains(count - room)
+        made = min(count, max(room, 0))
+        # Whatever didn't fit waits until grains leave or a bucket explodes
+        self.emitter.owed += count - made
+        if not made:
+            return
+
+        # Create new sugar to drop, all of the burst in one batch
+        wander = self.random.uniform(-SEED_SPOUT_JITTER, SEED_SPOUT_JITTER) if self.seed is not None else 0.0
+        start = self.sugar_grains.spawn(self.emitter.points(made, wander), (0, -self.emitter.speed))
+        if self.sensors:
+            # A recycled shape may have played the sound in its last life
+            self.sensors.played.difference_update(self.sugar_grains.shapes[start:])
+        self.grains_spawned += made
+        # Check if it's time to stop
+        if self.grains_spawned >= self.total_sugar_count:
+            self.level_grain_dropping = False
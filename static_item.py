@@ -48,6 +48,7 @@ class StaticItem:
         Draw the static line segment on the Pygame screen.
         
         :param screen: The Pygame screen to draw the line on.
+        :return: Number of draw calls made.
         """
         # Convert Pymunk coordinates to Pygame screen coordinates for rendering
         start_x = self.segment.a[0] * SCALE
@@ -59,6 +60,7 @@ class StaticItem:
 
         # Draw the line
         pg.draw.line(screen, pg.Color(self.color), start, end, self.line_width)
+        return 1
 
     def delete(self):
         """
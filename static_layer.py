@@ -0,0 +1,81 @@
+#############################################################
+# Module Name: Sugar Pop Static Layer Module
+# Project: Sugar Pop Program
+# Date: Oct 17, 2026
+# By: Christian Ramazani
+# Description: Off-screen cache of everything in a level that doesn't move
+#############################################################
+import pygame as pg
+from settings import HEIGHT
+
+SPOUT_COLOR = (255, 165, 144)
+
+
+class StaticLayer:
+    def __init__(self, size):
+        """
+        Initialize the static layer.
+
+        :param size: Size of the layer in pixels, normally the screen resolution.
+        """
+        self.surface = pg.Surface(size)
+        self.version = None  # Geometry version of the simulation the layer was drawn from
+        self.rebuilds = 0
+        self.rebuild_calls = 0  # Draw calls made by the last rebuild
+
+    def rebuild(self, sim):
+        """
+        Draw the background, walls, statics, buckets, finished user lines and
+        the spout onto the off-screen surface.
+
+        :param sim: The Simulation holding the level geometry.
+        """
+        calls = 1
+        self.surface.fill('black')
+        for static in sim.statics:
+            calls += static.draw(self.surface)
+        for bucket in sim.buckets:
+            calls += bucket.draw(self.surface)
+        for line in sim.drawing_lines:
+            calls += line.draw(self.surface)
+
+        # Draw the nozzle (Remember to subtract y from the height)
+        spout_position = sim.level_spout_position
+        if spout_position:
+            pg.draw.line(
+                self.surface,
+                SPOUT_COLOR,
+                (spout_position[0], HEIGHT - spout_position[1] - 10),
+                (spout_position[0], HEIGHT - spout_position[1]),
+                5
+            )
+            calls += 1
+
+        self.version = sim.geometry_version
+        self.rebuilds += 1
+        self.rebuild_calls = calls
+
+    def draw(self, screen, sim):
+        """
+        Blit the static layer onto the screen, redrawing it first if the geometry changed.
+
+        :param screen: The Pygame surface to draw on.
+        :param sim: The Simulation holding the level geometry.
+        :return: Number of draw calls made on the screen.
+        """
+        if self.version != sim.geometry_version:
+            self.rebuild(sim)
+        screen.blit(self.surface, (0, 0))
+        return 1
+
+    def restore(self, screen, rects):
+        """
+        Copy parts of the static layer back onto the screen, wiping what was drawn over them.
+
+        :param screen: The Pygame surface to draw on.
+        :param rects: Screen rectangles to restore.
+        :return: Number of draw calls made on the screen.
+        """
+        for rect in rects:
+            screen.blit(self.surface, rect, rect)
+        return len(rects)
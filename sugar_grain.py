@@ -8,8 +8,11 @@
 import pygame as pg
 import pymunk
 from settings import SCALE, HEIGHT
+from grain_pool import GRAIN_FILTER
 
 class sugar_grain:
+    __slots__ = ('space', 'body', 'shape', 'played')
+
     def __init__(self, space, x, y, friction=0.3):
         """
         Initialize a sugar grain as a small dynamic body in Pymunk.
@@ -38,6 +41,7 @@ class sugar_grain:
         self.shape = pymunk.Poly(self.body, vertices)
         self.shape.friction = friction
         self.shape.elasticity = 0.5  # Adjust as needed
+        self.shape.filter = GRAIN_FILTER
 
         # Add the body and shape to the space
         self.space.add(self.body, self.shape)
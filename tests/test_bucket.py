@@ -0,0 +1,68 @@
+import numpy as np
+import pygame as pg
+import pymunk
+import pytest
+from settings import RES, SCALE, HEIGHT, FREEZE_AFTER
+from grain_pool import GRAIN_QUERY_FILTER
+from grain_renderer import GRAIN_COLOR
+from simulation import Simulation
+from static_layer import StaticLayer
+
+
+@pytest.fixture
+def sim():
+    pg.init()
+    sim = Simulation(adaptive=False)
+    assert sim.load_level('./levels/level1.json')
+    return sim
+
+
+def pile(bucket, number):
+    """
+    Level (pixel) points of a small pile on the floor of a bucket.
+    """
+    left, right, bottom = bucket.interior()
+    x = (left + right) / 2 * SCALE
+    return [(x + (i % 5) * 3, bottom * SCALE + 2 + (i // 5) * 3) for i in range(number)]
+
+
+def test_frozen_fill_is_drawn(sim):
+    bucket = sim.buckets[0]
+    sim.sugar_grains.spawn(pile(bucket, 20))
+    sim.sugar_grains.sync()
+    version = sim.geometry_version
+
+    # Every grain in the bucket is asleep long enough to be frozen
+    sim.sugar_grains.asleep = lambda indices: True
+    bucket.settled_time = FREEZE_AFTER
+    sim.freeze_settled_buckets()
+    assert bucket.frozen_count == 20
+    assert len(sim.sugar_grains) == 0
+    assert sim.geometry_version == version + 1
+
+    layer = StaticLayer(RES)
+    layer.rebuild(sim)
+    left, right, bottom = bucket.interior()
+    middle = (bucket.fill_top + bottom) / 2
+    pixel = layer.surface.get_at((int((left + right) / 2 * SCALE), int(HEIGHT - middle * SCALE)))
+    assert pixel == pg.Color(GRAIN_COLOR)
+
+    sim.thaw(bucket)
+    assert sim.geometry_version == version + 2
+    assert bucket.fill_top is None
+    layer.rebuild(sim)
+    pixel = layer.surface.get_at((int((left + right) / 2 * SCALE), int(HEIGHT - middle * SCALE)))
+    assert pixel == pg.Color('black')
+
+
+def test_blast_query_finds_only_grains(sim):
+    bucket = sim.buckets[0]
+    sim.sugar_grains.spawn(pile(bucket, 10))
+    radius = 10.0  # Big enough to take in the walls and the level statics around the bucket
+    x, y = bucket.center()
+    everything = sim.space.bb_query(pymunk.BB(x - radius, y - radius, x + radius, y + radius), GRAIN_QUERY_FILTER)
+    assert any(shape.body.body_type != pymunk.Body.DYNAMIC for shape in everything)
+
+    bodies = bucket.grains_near(radius)
+    assert len(bodies) == 10
+    assert set(map(id, bodies)) <= set(map(id, sim.sugar_grains.bodies))